@@ -0,0 +1,761 @@
+"""
+Crawl benchmarks against a local fixture site.
+
+Usage:
+    py benchmark.py engines --pages 200 --latency 0.05 --concurrency 1 2 4 8 16
+    py benchmark.py pipeline --pages 200 --paragraphs 300 --workers 0 1 2 4
+    py benchmark.py extract --corpus path/to/saved/html/pages
+    py benchmark.py backends --corpus path/to/saved/html/pages
+    py benchmark.py report --corpus path/to/saved/html/pages --limit 5000
+    py benchmark.py analyze --pages 20000 --words 2000 --workers 1 2 4 8
+    py benchmark.py tfidf --pages 100000 --words 300
+    py benchmark.py suite --pages 1000 --latency 0.02 --output baseline.json
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+from fixture_site import FixtureSite
+from full_website_scraper import FullWebsiteScraper
+from content_analyzer import ContentAnalyzer
+from markdown_exporter import MarkdownExporter
+from simple_html_generator import generate_html
+
+try:
+    import resource  # not on Windows
+except ImportError:
+    resource = None
+
+
+def quiet():
+    """Silence the scraper's progress output while timing it."""
+    stack = contextlib.ExitStack()
+    stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+    stack.enter_context(contextlib.redirect_stderr(io.StringIO()))
+    return stack
+
+
+def time_crawl(base_url: str, max_pages: int, run) -> dict:
+    """Run one crawl and return pages, seconds and pages/sec."""
+    scraper = FullWebsiteScraper(base_url, max_pages=max_pages, polite=False)
+    start = time.perf_counter()
+    with quiet():
+        pages = run(scraper)
+    elapsed = time.perf_counter() - start
+    return {
+        'pages': len(pages),
+        'seconds': round(elapsed, 3),
+        'pages_per_sec': round(len(pages) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def bench_engines(args):
+    """Compare the serial loop with the async engine at several concurrencies."""
+    site = FixtureSite(num_pages=args.pages, fan_out=args.fan_out, latency=args.latency)
+    with site as base_url:
+        print(f"Fixture site: {args.pages} pages, {args.latency * 1000:.0f} ms latency")
+        print(f"{'engine':<12}{'concurrency':>12}{'pages':>8}{'seconds':>10}{'pages/sec':>12}")
+
+        result = time_crawl(base_url, args.pages, lambda s: s.scrape())
+        print(f"{'serial':<12}{1:>12}{result['pages']:>8}{result['seconds']:>10}{result['pages_per_sec']:>12}")
+
+        for concurrency in args.concurrency:
+            result = time_crawl(
+                base_url, args.pages,
+                lambda s: s.scrape_async(concurrency=concurrency, per_host_concurrency=concurrency),
+            )
+            print(f"{'async':<12}{concurrency:>12}{result['pages']:>8}{result['seconds']:>10}{result['pages_per_sec']:>12}")
+
+
+def bench_pipeline(args):
+    """Compare in-thread parsing with the process pool parse stage."""
+    site = FixtureSite(num_pages=args.pages, fan_out=args.fan_out,
+                       paragraphs=args.paragraphs, latency=args.latency)
+    with site as base_url:
+        page_kb = len(site.render(1)) / 1024
+        print(f"Fixture site: {args.pages} pages, ~{page_kb:.0f} KB each")
+        print(f"{'parse workers':<16}{'pages':>8}{'seconds':>10}{'pages/sec':>12}")
+
+        for workers in args.workers:
+            result = time_crawl(
+                base_url, args.pages,
+                lambda s: s.scrape_async(concurrency=args.concurrency,
+                                         per_host_concurrency=args.concurrency,
+                                         parse_workers=workers),
+            )
+            label = workers if workers else 'in-thread'
+            print(f"{label:<16}{result['pages']:>8}{result['seconds']:>10}{result['pages_per_sec']:>12}")
+
+
+def load_corpus(corpus: str, limit: int) -> list:
+    """Read up to limit .html files (or fixture pages when corpus is empty)."""
+    if not corpus:
+        site = FixtureSite(num_pages=limit)
+        return [site.render(idx) for idx in range(limit)]
+    files = sorted(Path(corpus).rglob('*.html'))[:limit]
+    return [f.read_bytes() for f in files]
+
+
+def extract_page_content_reference(scraper, soup, url: str) -> dict:
+    """Multi-pass reference version of FullWebsiteScraper.extract_page_content.
+
+    One find_all per field, as the scraper extracted pages before the
+    single walk; bench_extract checks both give identical output.
+    """
+    # Remove unwanted elements
+    for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
+        element.decompose()
+
+    content = {
+        'url': url,
+        'scraped_at': datetime.now().isoformat(),
+    }
+
+    # Title
+    title = soup.find('title')
+    if title:
+        content['title'] = scraper.clean_text(title.get_text())
+    else:
+        content['title'] = url
+
+    # Meta description
+    meta_desc = soup.find('meta', attrs={'name': 'description'})
+    if meta_desc:
+        content['meta_description'] = meta_desc.get('content', '')
+
+    # Canonical URL
+    canonical = soup.find('link', rel='canonical', href=True)
+    if canonical:
+        content['canonical_url'] = urljoin(url, canonical['href'])
+
+    # Main heading
+    h1 = soup.find('h1')
+    if h1:
+        content['main_heading'] = scraper.clean_text(h1.get_text())
+
+    # All headings
+    headings = []
+    for h in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+        heading_text = scraper.clean_text(h.get_text())
+        if heading_text:
+            headings.append({
+                'level': h.name,
+                'text': heading_text
+            })
+    content['headings'] = headings
+
+    # All paragraphs
+    paragraphs = []
+    for p in soup.find_all('p'):
+        para_text = scraper.clean_text(p.get_text())
+        if para_text and len(para_text) > 20:
+            paragraphs.append(para_text)
+    content['paragraphs'] = paragraphs
+
+    # Lists
+    lists = []
+    for ul in soup.find_all(['ul', 'ol']):
+        items = [scraper.clean_text(li.get_text()) for li in ul.find_all('li')]
+        items = [item for item in items if item]
+        if items:
+            lists.append(items)
+    content['lists'] = lists
+
+    # Links
+    links = []
+    for a in soup.find_all('a', href=True):
+        link_text = scraper.clean_text(a.get_text())
+        link_url = urljoin(url, a['href'])
+        if link_text and link_url:
+            links.append({'text': link_text, 'url': link_url})
+    content['links'] = links[:50]  # Limit to 50 links
+
+    # Images
+    images = []
+    for img in soup.find_all('img', src=True):
+        img_url = urljoin(url, img['src'])
+        img_alt = img.get('alt', '')
+        images.append({'url': img_url, 'alt': img_alt})
+    content['images'] = images[:20]  # Limit to 20 images
+
+    # Full text content
+    main_content = soup.find('main') or soup.find('article') or soup.find('body')
+    if main_content:
+        content['full_text'] = scraper.clean_text(main_content.get_text())
+    else:
+        content['full_text'] = scraper.clean_text(soup.get_text())
+
+    return content
+
+
+def bench_extract(args):
+    """Single-walk extract_page_content vs the multi-pass reference."""
+    documents = load_corpus(args.corpus, args.limit)
+    scraper = FullWebsiteScraper('http://example.com/', polite=False)
+    url = 'http://example.com/page.html'
+    timings = {'reference': 0.0, 'single walk': 0.0}
+    mismatches = 0
+
+    for _ in range(args.repeat):
+        for content in documents:
+            soups = [scraper.parse_content(content), scraper.parse_content(content)]
+
+            start = time.perf_counter()
+            expected = extract_page_content_reference(scraper, soups[0], url)
+            timings['reference'] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            actual = scraper.extract_page_content(soups[1], url)
+            timings['single walk'] += time.perf_counter() - start
+
+            expected.pop('scraped_at')
+            actual.pop('scraped_at')
+            if (json.dumps(expected, ensure_ascii=False) != json.dumps(actual, ensure_ascii=False)
+                    or str(soups[0]) != str(soups[1])):
+                mismatches += 1
+
+    print(f"Corpus: {len(documents)} pages x {args.repeat}")
+    for name, seconds in timings.items():
+        per_page = seconds / max(len(documents) * args.repeat, 1) * 1000
+        print(f"{name:<14}{seconds:>8.2f} s{per_page:>10.2f} ms/page")
+    print(f"Speedup: {timings['reference'] / timings['single walk']:.1f}x")
+    print(f"Output mismatches: {mismatches}")
+
+
+def bench_backends(args):
+    """Parse + extract time of the bs4 and lxml backends, and how often they agree."""
+    documents = load_corpus(args.corpus, args.limit)
+    url = 'http://example.com/page.html'
+    scrapers = {name: FullWebsiteScraper('http://example.com/', polite=False, backend=name)
+                for name in ('bs4', 'lxml')}
+    timings = {name: 0.0 for name in scrapers}
+    fields = {}
+
+    for content in documents:
+        results = {}
+        for name, scraper in scrapers.items():
+            start = time.perf_counter()
+            results[name] = scraper.extract_from_content(content, url, 'text/html; charset=utf-8')
+            timings[name] += time.perf_counter() - start
+
+        expected, actual = results['bs4'][0], results['lxml'][0]
+        for key in expected.keys() | actual.keys():
+            if key != 'scraped_at':
+                fields.setdefault(key, [0, 0])
+                fields[key][0] += expected.get(key) == actual.get(key)
+                fields[key][1] += 1
+
+    print(f"Corpus: {len(documents)} pages")
+    for name, seconds in timings.items():
+        print(f"{name:<6}{seconds:>8.2f} s{seconds / max(len(documents), 1) * 1000:>10.2f} ms/page")
+    print(f"Speedup: {timings['bs4'] / timings['lxml']:.1f}x")
+    print("Fields identical to bs4 backend:")
+    for key, (same, total) in sorted(fields.items()):
+        print(f"  {key:<18}{same / total:>8.1%}")
+
+
+# Runs a report's <script> in node with a stub DOM; prints ms until the
+# script has run and until allPages() has all page data.
+NODE_OPEN_JS = r"""
+const html = require('fs').readFileSync(process.argv[1], 'utf8');
+const script = html.slice(html.indexOf('<script>') + 8, html.lastIndexOf('</script>'));
+const stub = 'const document = { getElementById: () => ({ getBoundingClientRect: () => ({ top: 1e9 }) }) };'
+           + 'const window = { innerHeight: 0 };'
+           + 'class IntersectionObserver { observe() {} }';
+const start = performance.now();
+const allPages = new Function(stub + script + '; return allPages;')();
+const ready = performance.now();
+Promise.resolve(allPages()).then(pages => {
+    console.log(JSON.stringify([ready - start, performance.now() - start, pages.length]));
+});
+"""
+
+
+def time_open(html_file: str):
+    """(script ms, data ready ms) to open html_file in node, or None."""
+    node = shutil.which('node')
+    if not node:
+        return None
+    output = subprocess.run([node, '-e', NODE_OPEN_JS, html_file],
+                            capture_output=True, text=True, check=True).stdout
+    script_ms, data_ms, _ = json.loads(output)
+    return script_ms, data_ms
+
+
+def bench_report(args):
+    """Report size and open time: inline JSON vs compressed page data."""
+    documents = load_corpus(args.corpus, args.limit)
+    scraper = FullWebsiteScraper('http://example.com/', polite=False, backend='lxml')
+    pages = [scraper.extract_from_content(content, f'http://example.com/{idx}.html')[0]
+             for idx, content in enumerate(documents)]
+    stats = ContentAnalyzer.analyze_pages(pages)
+    variants = {
+        'inline': {},
+        'compressed': {'compress': True},
+        'lazy': {'lazy': True},
+        'lazy+compressed': {'lazy': True, 'compress': True},
+    }
+
+    print(f"Corpus: {len(pages)} pages")
+    if not shutil.which('node'):
+        print("(node not found: open times skipped)")
+    print(f"{'report':<18}{'MB':>8}{'write s':>9}{'script ms':>11}{'data ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, options in variants.items():
+            html_file = str(Path(tmp) / f'{name}.html')
+            start = time.perf_counter()
+            generate_html(pages, 'example.com', stats, 'http://example.com/', html_file, **options)
+            seconds = time.perf_counter() - start
+            size = Path(html_file).stat().st_size / 1e6
+            opened = time_open(html_file)
+            script_ms, data_ms = (f'{ms:.0f}' for ms in opened) if opened else ('-', '-')
+            print(f"{name:<18}{size:>8.1f}{seconds:>9.2f}{script_ms:>11}{data_ms:>9}")
+
+
+def synthetic_pages(num_pages: int, words: int, seed: int = 42) -> list:
+    """Pages of random text drawn from a Zipf-like vocabulary."""
+    rng = random.Random(seed)
+    vocabulary = [f'word{idx}' for idx in range(20000)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    return [{
+        'url': f'http://example.com/{idx}.html',
+        'full_text': ' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=words)),
+        'paragraphs': [''] * 10,
+        'headings': [{}] * 5,
+        'links': [{}] * 20,
+        'images': [],
+    } for idx in range(num_pages)]
+
+
+def bench_analyze(args):
+    """Serial analyze_pages vs the process pool map-reduce version."""
+    pages = synthetic_pages(args.pages, args.words)
+    print(f"Synthetic corpus: {args.pages} pages x {args.words} words")
+    print(f"{'workers':<10}{'seconds':>10}{'speedup':>10}{'same stats':>12}")
+
+    start = time.perf_counter()
+    expected = ContentAnalyzer.analyze_pages(pages)
+    serial = time.perf_counter() - start
+    print(f"{'serial':<10}{serial:>10.2f}{1:>10.1f}{'-':>12}")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        stats = ContentAnalyzer.analyze_pages_parallel(pages, workers=workers,
+                                                       chunk_size=args.chunk_size)
+        seconds = time.perf_counter() - start
+        print(f"{workers:<10}{seconds:>10.2f}{serial / seconds:>10.1f}{str(stats == expected):>12}")
+
+
+def bench_tfidf(args):
+    """Time building the term-document matrix and scoring it."""
+    from tfidf import TfidfAnalyzer
+
+    pages = synthetic_pages(args.pages, args.words)
+    print(f"Synthetic corpus: {args.pages} pages x {args.words} words")
+    analyzer = TfidfAnalyzer()
+
+    start = time.perf_counter()
+    for page in pages:
+        analyzer.update(page)
+    analyzer.flush()
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = analyzer.top_terms()
+    score = time.perf_counter() - start
+
+    print(f"Matrix: {len(analyzer.vocabulary):,} terms, {len(analyzer.indices):,} nonzeros")
+    print(f"{'build matrix':<16}{build:>8.2f} s")
+    print(f"{'tf-idf + top-k':<16}{score:>8.2f} s")
+    print(f"Top site terms: {', '.join(term for term, _ in result['site'][:5])}")
+
+
+def bench_duplicates(args):
+    """Crawl budget spent on print-view copies, with and without near-duplicate detection."""
+    site = FixtureSite(num_pages=args.pages, print_views=True)
+    with site as base_url:
+        print(f"Fixture site: {args.pages} pages, each with a print view; budget {args.budget}")
+        print(f"{'near_duplicates':<18}{'pages':>8}{'distinct':>10}{'seconds':>10}")
+        for mode in (None, 'mark', 'drop'):
+            scraper = FullWebsiteScraper(base_url, max_pages=args.budget, polite=False,
+                                         near_duplicates=mode)
+            start = time.perf_counter()
+            with quiet():
+                pages = scraper.scrape()
+            seconds = time.perf_counter() - start
+            distinct = sum('/print/' not in page['url'] for page in pages)
+            print(f"{str(mode):<18}{len(pages):>8}{distinct:>10}{seconds:>10.2f}")
+
+    from near_duplicates import NearDuplicateIndex
+
+    pages = synthetic_pages(args.index_pages, args.words)
+    index = NearDuplicateIndex()
+    start = time.perf_counter()
+    for page in pages:
+        index.check(page['url'], page['full_text'])
+    seconds = time.perf_counter() - start
+    print(f"Index check: {args.index_pages} synthetic pages, "
+          f"{seconds / args.index_pages * 1000:.2f} ms/page ({index.size} indexed)")
+
+
+def bench_canonical(args):
+    """Requests needed to crawl a whole site that spells its links in several ways."""
+    from url_canonicalizer import URLCanonicalizer
+
+    site = FixtureSite(num_pages=args.pages, url_variants=True)
+    with site as base_url:
+        print(f"Fixture site: {args.pages} pages, links in 5 spellings; crawled completely")
+        print(f"{'aliases':<22}{'pages':>8}{'distinct':>10}{'requests':>10}{'saved':>8}")
+        for label, follow in (('off', False), ('redirects+canonical', True)):
+            canonicalizer = URLCanonicalizer(base_url, rel_canonical=follow, redirects=follow)
+            scraper = FullWebsiteScraper(base_url, max_pages=10 * args.pages, polite=False,
+                                         canonicalizer=canonicalizer)
+            before = site.requests_served
+            with quiet():
+                pages = scraper.scrape()
+            requests_made = site.requests_served - before
+            distinct = len({page['title'] for page in pages})
+            print(f"{label:<22}{len(pages):>8}{distinct:>10}{requests_made:>10}"
+                  f"{scraper.fetches_saved:>8}")
+
+
+def bench_sitemaps(args):
+    """Link following vs sitemap seeding on a deep site (each page links to the next)."""
+    site = FixtureSite(num_pages=args.pages, fan_out=1, latency=args.latency, sitemap=True)
+    with site as base_url:
+        print(f"Fixture site: {args.pages} pages in a chain, {args.latency}s latency, "
+              f"async engine x{args.concurrency}")
+        print(f"{'discovery':<12}{'pages':>8}{'requests':>10}{'seconds':>10}{'pages/sec':>12}")
+        for label, sitemaps in (('links', False), ('sitemaps', True)):
+            scraper = FullWebsiteScraper(base_url, max_pages=args.pages, polite=False,
+                                         sitemaps=sitemaps)
+            before = site.requests_served
+            start = time.perf_counter()
+            with quiet():
+                pages = scraper.scrape_async(concurrency=args.concurrency,
+                                             per_host_concurrency=args.concurrency)
+            seconds = time.perf_counter() - start
+            print(f"{label:<12}{len(pages):>8}{site.requests_served - before:>10}"
+                  f"{seconds:>10.2f}{len(pages) / seconds:>12.1f}")
+
+
+def bench_downloads(args):
+    """Crawl a site that links to PDFs, ZIPs and huge pages, with and without content gating."""
+    from content_gate import ContentGate
+
+    site = FixtureSite(num_pages=args.pages, downloads=True)
+    with site as base_url:
+        print(f"Fixture site: {args.pages} pages, each linking to a PDF, a ZIP and a 3 MB page; "
+              f"budget {args.pages}")
+        print(f"{'gate':<6}{'pages':>8}{'html':>8}{'requests':>10}{'seconds':>10}")
+        gates = (('off', ContentGate(max_body_size=None, allowed_types=None, skip_extensions=())),
+                 ('on', ContentGate(max_body_size=args.max_body_kb * 1024)))
+        for label, gate in gates:
+            scraper = FullWebsiteScraper(base_url, max_pages=args.pages, polite=False,
+                                         content_gate=gate)
+            before = site.requests_served
+            start = time.perf_counter()
+            with quiet():
+                pages = scraper.scrape()
+            seconds = time.perf_counter() - start
+            html = sum(site._page_index(urlparse(page['url']).path) is not None for page in pages)
+            print(f"{label:<6}{len(pages):>8}{html:>8}{site.requests_served - before:>10}"
+                  f"{seconds:>10.2f}")
+        print(f"Skipped with gate on: {gates[1][1].summary()}")
+
+
+def bench_transports(args):
+    """Throughput and connections opened per HTTP transport (async engine)."""
+    from http_transport import HTTPXTransport, RequestsTransport
+
+    transports = (
+        ('requests', False, lambda: RequestsTransport(pool_size=args.concurrency)),
+        ('requests no keep-alive', False,
+         lambda: RequestsTransport(pool_size=args.concurrency, keep_alive=False)),
+        ('httpx HTTP/1.1', False, lambda: HTTPXTransport(http2=False, pool_size=args.concurrency)),
+        ('httpx HTTP/2', True, lambda: HTTPXTransport(http1=False, pool_size=args.concurrency)),
+    )
+    print(f"Fixture site: {args.pages} pages, {args.latency * 1000:.0f} ms latency, "
+          f"async engine x{args.concurrency}")
+    print(f"{'transport':<24}{'pages':>8}{'seconds':>10}{'pages/sec':>12}{'connections':>13}")
+    for label, http2, make_transport in transports:
+        site = FixtureSite(num_pages=args.pages, fan_out=args.fan_out, latency=args.latency,
+                           http2=http2)
+        with site as base_url:
+            transport = make_transport()
+            scraper = FullWebsiteScraper(base_url, max_pages=args.pages, polite=False,
+                                         transport=transport)
+            start = time.perf_counter()
+            with quiet():
+                pages = scraper.scrape_async(concurrency=args.concurrency,
+                                             per_host_concurrency=args.concurrency)
+            seconds = time.perf_counter() - start
+            transport.close()
+            print(f"{label:<24}{len(pages):>8}{seconds:>10.2f}{len(pages) / seconds:>12.1f}"
+                  f"{site.connections_opened:>13}")
+
+
+def bench_replay(args):
+    """Re-crawl vs offline re-extraction from a WARC archive of the same crawl."""
+    site = FixtureSite(num_pages=args.pages, fan_out=args.fan_out, paragraphs=args.paragraphs,
+                       latency=args.latency)
+    with tempfile.TemporaryDirectory() as warc_dir:
+        with site as base_url:
+            print(f"Fixture site: {args.pages} pages, {args.latency * 1000:.0f} ms latency, "
+                  f"async engine x{args.concurrency}")
+            print(f"{'run':<18}{'pages':>8}{'seconds':>10}{'pages/sec':>12}")
+            scraper = FullWebsiteScraper(base_url, max_pages=args.pages, polite=False,
+                                         backend=args.backend, warc_dir=warc_dir)
+            start = time.perf_counter()
+            with quiet():
+                crawled = scraper.scrape_async(concurrency=args.concurrency,
+                                               per_host_concurrency=args.concurrency)
+            seconds = time.perf_counter() - start
+            print(f"{'crawl + archive':<18}{len(crawled):>8}{seconds:>10.2f}"
+                  f"{len(crawled) / seconds:>12.1f}")
+
+        expected = sorted((page['url'], page['full_text']) for page in crawled)
+        archive_mb = sum(path.stat().st_size for path in Path(warc_dir).iterdir()) / 1024 / 1024
+        for workers in args.workers:
+            scraper = FullWebsiteScraper(base_url, backend=args.backend)
+            start = time.perf_counter()
+            with quiet():
+                pages = scraper.replay_warc(warc_dir, workers=workers)
+            seconds = time.perf_counter() - start
+            same = sorted((page['url'], page['full_text']) for page in pages) == expected
+            label = f"replay x{workers}" if workers else 'replay in-process'
+            print(f"{label:<18}{len(pages):>8}{seconds:>10.2f}{len(pages) / seconds:>12.1f}"
+                  f"{'' if same else '   (pages differ!)'}")
+        print(f"Archive: {archive_mb:.1f} MB")
+
+
+def serve_fixture(settings: dict, conn):
+    """Child process: serve a FixtureSite, send its URL, stop when told to."""
+    site = FixtureSite(**settings)
+    conn.send(site.start())
+    conn.recv()
+    site.stop()
+
+
+def cpu_seconds() -> float:
+    """CPU time of this process and its finished child processes (all threads)."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def peak_rss_mb():
+    """Highest resident memory of this process so far, in MB (None on Windows)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if platform.system() == 'Darwin' else 1024), 1)
+
+
+def run_stage(stages: dict, name: str, func):
+    """Run func() quietly and record its wall time, CPU time and peak RSS in stages."""
+    wall, cpu = time.perf_counter(), cpu_seconds()
+    with quiet():
+        result = func()
+    stages[name] = {
+        'seconds': round(time.perf_counter() - wall, 3),
+        'cpu_seconds': round(cpu_seconds() - cpu, 3),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    return result
+
+
+def bench_suite(args):
+    """Crawl, analyze and export a fixture site; report per-stage costs as JSON.
+
+    The site is served from a child process, so its CPU time is not
+    counted. peak_rss_mb is the process's high-water mark after each stage.
+    """
+    settings = {'num_pages': args.pages, 'fan_out': args.fan_out,
+                'paragraphs': args.paragraphs, 'latency': args.latency,
+                'latency_profile': args.latency_profile, 'seed': args.seed}
+    parent_conn, child_conn = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve_fixture, args=(settings, child_conn),
+                                     daemon=True)
+    server.start()
+    base_url = parent_conn.recv()
+    stages = {}
+    try:
+        scraper = FullWebsiteScraper(base_url, max_pages=args.pages, polite=False,
+                                     backend=args.backend)
+        if args.engine == 'async':
+            pages = run_stage(stages, 'scrape', lambda: scraper.scrape_async(
+                concurrency=args.concurrency, per_host_concurrency=args.concurrency,
+                parse_workers=args.parse_workers))
+        else:
+            pages = run_stage(stages, 'scrape', scraper.scrape)
+    finally:
+        parent_conn.send('stop')
+        server.join()
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        md_file = str(Path(out_dir) / 'scraped_content.md')
+        html_file = str(Path(out_dir) / 'scraped_website.html')
+        stats = run_stage(stages, 'analyze', lambda: ContentAnalyzer.analyze_pages(pages))
+        run_stage(stages, 'markdown',
+                  lambda: MarkdownExporter.export(pages, scraper.domain, md_file))
+        run_stage(stages, 'html',
+                  lambda: generate_html(pages, scraper.domain, stats, base_url, html_file))
+        output_bytes = {'markdown': Path(md_file).stat().st_size,
+                        'html': Path(html_file).stat().st_size}
+
+    page_html = FixtureSite(**settings).render(1)
+    scrape_seconds = stages['scrape']['seconds']
+    report = {
+        'benchmark': 'suite',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'site': {**settings, 'page_kb': round(len(page_html) / 1024, 1)},
+        'crawl': {'engine': args.engine, 'concurrency': args.concurrency,
+                  'parse_workers': args.parse_workers, 'backend': args.backend},
+        'pages': len(pages),
+        'pages_per_sec': round(len(pages) / scrape_seconds, 1) if scrape_seconds else 0.0,
+        'total_seconds': round(sum(stage['seconds'] for stage in stages.values()), 3),
+        'total_cpu_seconds': round(sum(stage['cpu_seconds'] for stage in stages.values()), 3),
+        'peak_rss_mb': peak_rss_mb(),
+        'stages': stages,
+        'output_bytes': output_bytes,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + '\n', encoding='utf-8')
+    print(text)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Website Scraper Pro benchmarks")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    engines = sub.add_parser('engines', help="serial loop vs async engine")
+    engines.add_argument('--pages', type=int, default=200)
+    engines.add_argument('--fan-out', type=int, default=8)
+    engines.add_argument('--latency', type=float, default=0.05,
+                         help="seconds the fixture server waits before each response")
+    engines.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    engines.set_defaults(func=bench_engines)
+
+    pipeline = sub.add_parser('pipeline', help="in-thread parsing vs process pool")
+    pipeline.add_argument('--pages', type=int, default=200)
+    pipeline.add_argument('--fan-out', type=int, default=8)
+    pipeline.add_argument('--paragraphs', type=int, default=300,
+                          help="paragraphs per page (controls parse cost)")
+    pipeline.add_argument('--latency', type=float, default=0.0)
+    pipeline.add_argument('--concurrency', type=int, default=16)
+    pipeline.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4])
+    pipeline.set_defaults(func=bench_pipeline)
+
+    extract = sub.add_parser('extract', help="single-walk extraction vs multi-pass reference")
+    extract.add_argument('--corpus', default=None,
+                         help="folder of saved .html pages (default: fixture pages)")
+    extract.add_argument('--limit', type=int, default=500)
+    extract.add_argument('--repeat', type=int, default=1)
+    extract.set_defaults(func=bench_extract)
+
+    backends = sub.add_parser('backends', help="bs4 vs lxml extraction backend")
+    backends.add_argument('--corpus', default=None,
+                          help="folder of saved .html pages (default: fixture pages)")
+    backends.add_argument('--limit', type=int, default=500)
+    backends.set_defaults(func=bench_backends)
+
+    report = sub.add_parser('report', help="report size and open time, inline vs compressed data")
+    report.add_argument('--corpus', default=None,
+                        help="folder of saved .html pages (default: fixture pages)")
+    report.add_argument('--limit', type=int, default=2000)
+    report.set_defaults(func=bench_report)
+
+    analyze = sub.add_parser('analyze', help="serial vs parallel content analysis")
+    analyze.add_argument('--pages', type=int, default=20000)
+    analyze.add_argument('--words', type=int, default=2000, help="words per page")
+    analyze.add_argument('--chunk-size', type=int, default=500)
+    analyze.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    analyze.set_defaults(func=bench_analyze)
+
+    tfidf = sub.add_parser('tfidf', help="TF-IDF matrix build and scoring time")
+    tfidf.add_argument('--pages', type=int, default=100000)
+    tfidf.add_argument('--words', type=int, default=300, help="words per page")
+    tfidf.set_defaults(func=bench_tfidf)
+
+    duplicates = sub.add_parser('duplicates', help="crawl budget saved by near-duplicate detection")
+    duplicates.add_argument('--pages', type=int, default=400)
+    duplicates.add_argument('--budget', type=int, default=200, help="max_pages of each crawl")
+    duplicates.add_argument('--index-pages', type=int, default=20000)
+    duplicates.add_argument('--words', type=int, default=300, help="words per synthetic page")
+    duplicates.set_defaults(func=bench_duplicates)
+
+    canonical = sub.add_parser('canonical', help="fetches saved by URL canonicalization")
+    canonical.add_argument('--pages', type=int, default=200)
+    canonical.set_defaults(func=bench_canonical)
+
+    sitemaps = sub.add_parser('sitemaps', help="link following vs sitemap seeding")
+    sitemaps.add_argument('--pages', type=int, default=300)
+    sitemaps.add_argument('--latency', type=float, default=0.05)
+    sitemaps.add_argument('--concurrency', type=int, default=8)
+    sitemaps.set_defaults(func=bench_sitemaps)
+
+    downloads = sub.add_parser('downloads', help="content-type / size gating of downloads")
+    downloads.add_argument('--pages', type=int, default=100)
+    downloads.add_argument('--max-body-kb', type=int, default=1024)
+    downloads.set_defaults(func=bench_downloads)
+
+    replay = sub.add_parser('replay', help="re-crawl vs re-extraction from a WARC archive")
+    replay.add_argument('--pages', type=int, default=500)
+    replay.add_argument('--fan-out', type=int, default=8)
+    replay.add_argument('--paragraphs', type=int, default=30)
+    replay.add_argument('--latency', type=float, default=0.05)
+    replay.add_argument('--concurrency', type=int, default=16)
+    replay.add_argument('--backend', choices=['bs4', 'lxml'], default='bs4')
+    replay.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4])
+    replay.set_defaults(func=bench_replay)
+
+    transports = sub.add_parser('transports', help="requests (HTTP/1.1) vs httpx (HTTP/2) transport")
+    transports.add_argument('--pages', type=int, default=500)
+    transports.add_argument('--fan-out', type=int, default=8)
+    transports.add_argument('--latency', type=float, default=0.05)
+    transports.add_argument('--concurrency', type=int, default=32)
+    transports.set_defaults(func=bench_transports)
+
+    suite = sub.add_parser('suite', help="crawl + analyze + export, per-stage costs as JSON")
+    suite.add_argument('--pages', type=int, default=500)
+    suite.add_argument('--fan-out', type=int, default=8)
+    suite.add_argument('--paragraphs', type=int, default=10,
+                       help="paragraphs per page (page weight)")
+    suite.add_argument('--latency', type=float, default=0.02,
+                       help="mean seconds the fixture server waits before each response")
+    suite.add_argument('--latency-profile', choices=['fixed', 'uniform', 'long_tail'],
+                       default='fixed')
+    suite.add_argument('--seed', type=int, default=42)
+    suite.add_argument('--engine', choices=['serial', 'async'], default='async')
+    suite.add_argument('--concurrency', type=int, default=16)
+    suite.add_argument('--parse-workers', type=int, default=0)
+    suite.add_argument('--backend', choices=['bs4', 'lxml'], default='bs4')
+    suite.add_argument('--output', default=None, help="also write the JSON report to this file")
+    suite.set_defaults(func=bench_suite)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,185 @@
-from collections import Counter
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+import os
 import re
 
+from heavy_hitters import HeavyHitters
+
+
+STOP_WORDS = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
+              'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be',
+              'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
+              'would', 'should', 'could', 'may', 'might', 'must', 'can', 'this',
+              'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they'}
+
+WORD_RE = re.compile(r'\b\w+\b')
+
 
 class ContentAnalyzer:
+    """Running content statistics.
     
-    @staticmethod
-    def analyze_pages(pages: list) -> dict:
+    Feed pages one at a time with update() (or register the analyzer as a
+    page sink, it has write()), combine analyzers built from different
+    slices of a crawl with merge(), and read the result with stats().
+    
+    ngrams lists the phrase lengths to count for top_phrases, e.g. (2, 3).
+    With approximate=True keywords and phrases are counted with
+    HeavyHitters summaries of `capacity` entries instead of exact
+    Counters, so memory stays fixed however large the crawl is; counts
+    are then lower bounds, off by at most stats()['max_error'].
+    """
+    
+    def __init__(self, approximate: bool = False, capacity: int = 10000, ngrams: tuple = ()):
+        self.options = {'approximate': approximate, 'capacity': capacity, 'ngrams': tuple(ngrams)}
+        self.approximate = approximate
+        self.ngrams = tuple(ngrams)
+        self.total_pages = 0
+        self.total_words = 0
+        self.total_paragraphs = 0
+        self.total_headings = 0
+        self.total_links = 0
+        self.total_images = 0
+        self.word_counts = HeavyHitters(capacity) if approximate else Counter()
+        self.phrase_counts = HeavyHitters(capacity) if approximate else Counter()
+    
+    def update(self, page: dict):
+        """Add one page to the statistics."""
+        return self._add(_page_counts(page))
+    
+    def _add(self, counts: tuple):
+        """Add one page given as _page_counts() output."""
+        full_text, paragraphs, headings, links, images = counts
+        words = WORD_RE.findall(full_text.lower())
+        self.total_pages += 1
+        self.total_words += len(words)
+        self.total_paragraphs += paragraphs
+        self.total_headings += headings
+        self.total_links += links
+        self.total_images += images
+        keywords = (w for w in words if w not in STOP_WORDS and len(w) > 3)
+        if self.approximate:
+            self.word_counts.update(Counter(keywords))
+        else:
+            self.word_counts.update(keywords)
+        if self.ngrams:
+            phrases = self._phrases(words)
+            if self.approximate:
+                self.phrase_counts.update(Counter(phrases))
+            else:
+                self.phrase_counts.update(phrases)
+        return self
+    
+    def _phrases(self, words: list):
+        """n-grams of words (for each n in self.ngrams) without stop words."""
+        stop = [w in STOP_WORDS for w in words]
+        for n in self.ngrams:
+            grams = zip(*(words[i:] for i in range(n)))
+            stopped = zip(*(stop[i:] for i in range(n)))
+            for gram, has_stop in zip(grams, stopped):
+                if not any(has_stop):
+                    yield ' '.join(gram)
+    
+    def merge(self, other: 'ContentAnalyzer'):
+        """Add the statistics of another analyzer to this one."""
+        self.total_pages += other.total_pages
+        self.total_words += other.total_words
+        self.total_paragraphs += other.total_paragraphs
+        self.total_headings += other.total_headings
+        self.total_links += other.total_links
+        self.total_images += other.total_images
+        if self.approximate:
+            self.word_counts.merge(other.word_counts)
+            self.phrase_counts.merge(other.phrase_counts)
+        else:
+            self.word_counts.update(other.word_counts)
+            self.phrase_counts.update(other.phrase_counts)
+        return self
+    
+    def stats(self) -> dict:
+        """Statistics of all pages seen so far."""
         stats = {
-            'total_pages': len(pages),
-            'total_words': 0,
-            'total_paragraphs': 0,
-            'total_headings': 0,
-            'total_links': 0,
-            'total_images': 0,
+            'total_pages': self.total_pages,
+            'total_words': self.total_words,
+            'total_paragraphs': self.total_paragraphs,
+            'total_headings': self.total_headings,
+            'total_links': self.total_links,
+            'total_images': self.total_images,
             'avg_words_per_page': 0,
-            'top_keywords': [],
+            'top_keywords': self.word_counts.most_common(20),
+            'top_phrases': self.phrase_counts.most_common(20),
             'reading_time_minutes': 0,
         }
         
-        all_words = []
+        if self.approximate:
+            stats['max_error'] = {'keywords': self.word_counts.max_error,
+                                  'phrases': self.phrase_counts.max_error}
         
-        for page in pages:
-            full_text = page.get('full_text', '')
-            words = re.findall(r'\b\w+\b', full_text.lower())
-            all_words.extend(words)
-            stats['total_words'] += len(words)
-            
-            stats['total_paragraphs'] += len(page.get('paragraphs', []))
-            stats['total_headings'] += len(page.get('headings', []))
-            stats['total_links'] += len(page.get('links', []))
-            stats['total_images'] += len(page.get('images', []))
+        if self.total_pages > 0:
+            stats['avg_words_per_page'] = self.total_words // self.total_pages
+            stats['reading_time_minutes'] = self.total_words // 200
         
-        if stats['total_pages'] > 0:
-            stats['avg_words_per_page'] = stats['total_words'] // stats['total_pages']
-            stats['reading_time_minutes'] = stats['total_words'] // 200
+        return stats
+    
+    # Page sink interface (see page_sinks.py)
+    write = update
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        pass
+    
+    @staticmethod
+    def analyze_pages(pages: list, **options) -> dict:
+        analyzer = ContentAnalyzer(**options)
+        for page in pages:
+            analyzer.update(page)
+        return analyzer.stats()
+    
+    @staticmethod
+    def analyze_pages_parallel(pages, workers: int = None, chunk_size: int = 500,
+                               **options) -> dict:
+        """analyze_pages() spread over a process pool.
         
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-                     'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be',
-                     'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
-                     'would', 'should', 'could', 'may', 'might', 'must', 'can', 'this',
-                     'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they'}
+        Pages are sent to the workers in chunks of chunk_size; each worker
+        returns a partial ContentAnalyzer and the partials are merged in
+        order, so the result is identical to analyze_pages() (approximate
+        counts may differ, but stay within the same error bounds).
+        options are passed on to ContentAnalyzer().
+        """
+        workers = workers or os.cpu_count() or 1
+        analyzer = ContentAnalyzer(**options)
         
-        filtered_words = [w for w in all_words if w not in stop_words and len(w) > 3]
-        word_counts = Counter(filtered_words)
-        stats['top_keywords'] = word_counts.most_common(20)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            chunk = []
+            for page in pages:
+                # Only ship the fields the analysis needs
+                chunk.append(_page_counts(page))
+                if len(chunk) == chunk_size:
+                    pending.append(pool.submit(_analyze_chunk, chunk, analyzer.options))
+                    chunk = []
+                    # Bound the number of chunks held in memory
+                    while len(pending) > workers * 2:
+                        analyzer.merge(pending.popleft().result())
+            if chunk:
+                pending.append(pool.submit(_analyze_chunk, chunk, analyzer.options))
+            for future in pending:
+                analyzer.merge(future.result())
         
-        return stats
+        return analyzer.stats()
+
+
+def _page_counts(page: dict) -> tuple:
+    """The parts of a page the analysis uses."""
+    return (page.get('full_text', ''), len(page.get('paragraphs', [])),
+            len(page.get('headings', [])), len(page.get('links', [])),
+            len(page.get('images', [])))
+
+
+def _analyze_chunk(chunk: list, options: dict) -> ContentAnalyzer:
+    """Process pool worker: partial statistics of one chunk of pages."""
+    analyzer = ContentAnalyzer(**options)
+    for counts in chunk:
+        analyzer._add(counts)
+    return analyzer
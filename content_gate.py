@@ -0,0 +1,100 @@
+"""
+Content-type and size gating for page downloads.
+
+Pages link to PDFs, archives, images and videos as well as to other
+pages. ContentGate keeps the crawler from downloading them:
+
+- skip_url() drops links whose path ends in a known non-HTML extension
+  (.pdf, .zip, .mp4, ...) before they are ever queued
+- read() looks at a streamed response's headers first: a non-HTML
+  Content-Type, or a Content-Length above max_body_size, closes the
+  response before the body is downloaded. Bodies without a
+  Content-Length are read chunk by chunk and abandoned once they grow
+  past max_body_size.
+
+Every skip is counted per reason, together with the bytes not downloaded
+(when the server announced a length).
+"""
+
+from urllib.parse import urlsplit
+import threading
+
+
+HTML_TYPES = ('text/html', 'application/xhtml+xml')
+SKIP_EXTENSIONS = frozenset({
+    # documents and data
+    'pdf', 'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx', 'odt', 'ods', 'odp', 'rtf',
+    'csv', 'json', 'xml', 'rss', 'atom', 'txt',
+    # archives and binaries
+    'zip', 'gz', 'tgz', 'bz2', 'xz', '7z', 'rar', 'tar', 'jar', 'exe', 'msi', 'dmg',
+    'iso', 'apk', 'deb', 'rpm', 'bin', 'whl',
+    # images
+    'png', 'jpg', 'jpeg', 'gif', 'webp', 'svg', 'ico', 'bmp', 'tif', 'tiff', 'avif',
+    # audio and video
+    'mp3', 'wav', 'ogg', 'flac', 'm4a', 'mp4', 'm4v', 'mov', 'avi', 'mkv', 'webm',
+    # page assets
+    'css', 'js', 'mjs', 'map', 'woff', 'woff2', 'ttf', 'otf', 'eot',
+})
+CHUNK_SIZE = 64 * 1024
+REASONS = ('extension', 'content_type', 'too_large')
+
+
+class ContentGate:
+    """Decides which URLs and responses are worth downloading."""
+
+    def __init__(self, max_body_size: int = 10 * 1024 * 1024, allowed_types=HTML_TYPES,
+                 skip_extensions=SKIP_EXTENSIONS):
+        """max_body_size in bytes (None: no limit); allowed_types=None allows every type."""
+        self.max_body_size = max_body_size
+        self.allowed_types = frozenset(allowed_types) if allowed_types else None
+        self.skip_extensions = frozenset(ext.lower().lstrip('.') for ext in skip_extensions)
+        self.skipped = dict.fromkeys(REASONS, 0)
+        self.bytes_avoided = 0
+        self._lock = threading.Lock()
+
+    def _count(self, reason: str, bytes_avoided: int = 0):
+        with self._lock:
+            self.skipped[reason] += 1
+            self.bytes_avoided += bytes_avoided
+
+    def skip_url(self, url: str) -> bool:
+        """True (and counted) if url's extension says it is not a page."""
+        if not self.skip_extensions:
+            return False
+        name = urlsplit(url).path.rpartition('/')[2]
+        if '.' not in name or name.rpartition('.')[2].lower() not in self.skip_extensions:
+            return False
+        self._count('extension')
+        return True
+
+    def read(self, response):
+        """Body of a streamed response, or None if it was skipped (and closed)."""
+        length = response.headers.get('Content-Length', '')
+        length = int(length) if length.isdigit() else None
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+
+        reason = None
+        if self.allowed_types and content_type and content_type not in self.allowed_types:
+            reason = 'content_type'
+        elif self.max_body_size is not None and (length or 0) > self.max_body_size:
+            reason = 'too_large'
+        if reason:
+            response.close()
+            self._count(reason, length or 0)
+            return None
+
+        chunks, size = [], 0
+        for chunk in response.iter_content(CHUNK_SIZE):
+            size += len(chunk)
+            if self.max_body_size is not None and size > self.max_body_size:
+                response.close()
+                self._count('too_large', max((length or 0) - size, 0))
+                return None
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    def summary(self) -> str:
+        """One-line skip report."""
+        counts = ', '.join(f"{self.skipped[reason]} {reason.replace('_', ' ')}"
+                           for reason in REASONS)
+        return f"{counts} ({self.bytes_avoided / 1024:.1f} KB not downloaded)"
@@ -0,0 +1,100 @@
+"""
+Crawl frontier: which URL to fetch next.
+
+A URL is added at most once. The "seen" set covers both queued and
+visited URLs, so a page linked from 100 other pages is still fetched once.
+The order is decided by a priority policy:
+
+- fifo:         first in, first out (deque, O(1))
+- bfs:          shallowest crawl depth first
+- shallow_path: fewest URL path segments first (/docs before /docs/a/b/c)
+- sitemap:      highest sitemap <priority> first, then by depth
+
+A policy is a function (url, depth, meta) -> sort key, smaller first, so
+custom policies can be passed instead of a name.
+"""
+
+from collections import deque
+from urllib.parse import urlparse
+import heapq
+
+
+def bfs_policy(url: str, depth: int, meta: dict):
+    """Shallowest crawl depth first."""
+    return depth
+
+
+def shallow_path_policy(url: str, depth: int, meta: dict):
+    """Fewest path segments first, then crawl depth."""
+    segments = [part for part in urlparse(url).path.split('/') if part]
+    return (len(segments), depth)
+
+
+def sitemap_policy(url: str, depth: int, meta: dict):
+    """Highest sitemap priority first (0.5 when unknown), then crawl depth."""
+    try:
+        priority = float(meta.get('priority', 0.5))
+    except (TypeError, ValueError):
+        priority = 0.5
+    return (-priority, depth)
+
+
+POLICIES = {
+    'fifo': None,
+    'bfs': bfs_policy,
+    'shallow_path': shallow_path_policy,
+    'sitemap': sitemap_policy,
+}
+
+
+class CrawlFrontier:
+    """Queue of URLs to visit with O(1) dedup."""
+
+    def __init__(self, policy='bfs'):
+        """Initialize frontier with a policy name or key function."""
+        if isinstance(policy, str):
+            if policy not in POLICIES:
+                raise ValueError(f"Unknown priority policy: {policy}")
+            policy = POLICIES[policy]
+        self.policy = policy
+        self.seen = set()
+        self._queue = deque()
+        self._heap = []
+        self._counter = 0
+
+    def add(self, url: str, depth: int = 0, meta: dict = None) -> bool:
+        """Queue url unless it was seen before. Returns True if queued."""
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        meta = meta or {}
+        if self.policy is None:
+            self._queue.append((url, depth, meta))
+        else:
+            # The counter keeps equal keys in insertion order
+            key = self.policy(url, depth, meta)
+            heapq.heappush(self._heap, (key, self._counter, url, depth, meta))
+            self._counter += 1
+        return True
+
+    def mark_seen(self, url: str):
+        """Remember url without queueing it (e.g. a redirect target)."""
+        self.seen.add(url)
+
+    def requeue(self, url: str, depth: int = 0, meta: dict = None):
+        """Queue a seen url again (e.g. to retry it)."""
+        self.seen.discard(url)
+        self.add(url, depth, meta)
+
+    def pop(self):
+        """Return the next (url, depth, meta) to visit."""
+        if self.policy is None:
+            return self._queue.popleft()
+        _, _, url, depth, meta = heapq.heappop(self._heap)
+        return url, depth, meta
+
+    def __len__(self):
+        return len(self._queue) + len(self._heap)
+
+    def __contains__(self, url: str):
+        return url in self.seen
@@ -0,0 +1,150 @@
+"""
+Persistent crawl state for resumable crawls.
+
+Stores the frontier, the seen set, per-URL status and the extracted page
+records in a SQLite file. Changes are buffered and committed in batches
+of whole pages (a page's record and the links it discovered always land
+in the same transaction), so after a crash `scrape(resume=True)` picks up
+from the last checkpoint without refetching completed pages.
+
+The database is opened on first use and may be used from any one thread
+at a time, so a scraper built in one thread can crawl in another. The
+scraper closes it when a crawl ends; the next use opens it again.
+"""
+
+import json
+import sqlite3
+
+
+QUEUED = 'queued'
+DONE = 'done'
+FAILED = 'failed'
+DUPLICATE = 'duplicate'
+
+
+class CrawlState:
+    """SQLite-backed frontier, seen set and page store."""
+
+    def __init__(self, db_path: str, batch_size: int = 50):
+        """Use (or create) the state database at db_path."""
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self._conn = None
+        self._queued = []
+        self._status = []
+        self._pages = []
+        self._pages_since_commit = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = self._connect()  # also reads the sequence counters
+        return self._conn
+
+    def _connect(self) -> sqlite3.Connection:
+        # Callers take turns (the crawl loop), not threads at once
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS urls (
+                url    TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                depth  INTEGER NOT NULL,
+                meta   TEXT,
+                seq    INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                url  TEXT PRIMARY KEY,
+                seq  INTEGER NOT NULL,
+                data TEXT NOT NULL
+            );
+        ''')
+        conn.commit()
+        self._seq = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM urls').fetchone()[0]
+        self._page_seq = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM pages').fetchone()[0]
+        return conn
+
+    def reset(self):
+        """Forget any previous crawl."""
+        self.conn.execute('DELETE FROM urls')
+        self.conn.execute('DELETE FROM pages')
+        self.conn.commit()
+        self._seq = self._page_seq = 0
+
+    def load(self):
+        """Return (pending, seen, done) saved by a previous crawl.
+
+        pending is a list of (url, depth, meta) still to visit, in the
+        order they were queued; seen holds every known URL and done the
+        URLs whose pages were saved (see iter_pages()).
+        """
+        pending = [
+            (url, depth, json.loads(meta) if meta else {})
+            for url, depth, meta in self.conn.execute(
+                'SELECT url, depth, meta FROM urls WHERE status = ? ORDER BY seq', (QUEUED,)
+            )
+        ]
+        seen = {url for (url,) in self.conn.execute('SELECT url FROM urls')}
+        done = [url for (url,) in self.conn.execute('SELECT url FROM pages ORDER BY seq')]
+        return pending, seen, done
+
+    def iter_pages(self):
+        """Yield the saved page records in crawl order."""
+        for (data,) in self.conn.execute('SELECT data FROM pages ORDER BY seq'):
+            yield json.loads(data)
+
+    def queued(self, url: str, depth: int, meta: dict = None):
+        """Buffer a newly queued URL."""
+        self.conn
+        self._seq += 1
+        self._queued.append((url, QUEUED, depth, json.dumps(meta) if meta else None, self._seq))
+
+    def done(self, url: str, page: dict):
+        """Buffer a completed page and its record."""
+        self.conn
+        self._page_seq += 1
+        self._status.append((DONE, url))
+        self._pages.append((url, self._page_seq, json.dumps(page, ensure_ascii=False)))
+
+    def failed(self, url: str):
+        """Buffer a URL that could not be fetched."""
+        self._status.append((FAILED, url))
+
+    def duplicate(self, url: str):
+        """Buffer a URL dropped as a near-duplicate of another page."""
+        self._status.append((DUPLICATE, url))
+
+    def checkpoint(self, before_commit=None):
+        """Call after each processed page; commits every batch_size pages.
+
+        before_commit() runs right before each commit (the scraper flushes
+        its page sinks there).
+        """
+        self._pages_since_commit += 1
+        if self._pages_since_commit >= self.batch_size:
+            if before_commit:
+                before_commit()
+            self.flush()
+
+    def flush(self):
+        """Write all buffered changes in one transaction."""
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO urls (url, status, depth, meta, seq) VALUES (?, ?, ?, ?, ?)',
+                self._queued,
+            )
+            self.conn.executemany('UPDATE urls SET status = ? WHERE url = ?', self._status)
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO pages (url, seq, data) VALUES (?, ?, ?)', self._pages
+            )
+        self._queued, self._status, self._pages = [], [], []
+        self._pages_since_commit = 0
+
+    def close(self):
+        """Flush and close the database (it reopens on next use)."""
+        if self._conn is None:
+            return
+        self.flush()
+        self._conn.close()
+        self._conn = None
@@ -0,0 +1,408 @@
+"""
+Synthetic fixture website served from localhost.
+
+Used by benchmark.py so crawl speed can be measured without touching a
+real site. Every page is generated from a seed, so two runs with the same
+settings serve byte-identical content.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+import asyncio
+import gzip
+import hashlib
+import random
+import threading
+import time
+
+
+WORDS = ('crawler documentation python request response session parser '
+         'content heading paragraph analysis keyword export markdown search '
+         'performance latency throughput concurrency worker process thread '
+         'network server client cache index report page website').split()
+
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+SITEMAP_SIZE = 100  # pages per sitemap file
+LATENCY_PROFILES = ('fixed', 'uniform', 'long_tail')
+
+
+class FixtureSite:
+    """Deterministic website with configurable size, fan-out and latency."""
+
+    def __init__(self, num_pages: int = 200, fan_out: int = 8, paragraphs: int = 10,
+                 latency: float = 0.0, seed: int = 42, crawl_delay: float = None,
+                 latency_profile: str = 'fixed',
+                 print_views: bool = False, url_variants: bool = False,
+                 sitemap: bool = False, disallow=(), downloads: bool = False,
+                 http2: bool = False):
+        """Initialize site settings.
+
+        latency_profile spreads response delays around latency (the mean):
+        'fixed' (always latency), 'uniform' (0 to 2 * latency) or
+        'long_tail' (Pareto: most responses fast, a few up to 20x slower).
+        Each path always gets the same delay.
+        print_views=True gives every page a linked /print/<n>.html copy
+        with the same text, for near-duplicate detection benchmarks.
+        url_variants=True spells links in several equivalent ways
+        (tracking parameters, #fragments, percent-escapes, /index.html,
+        /go/<n> redirects) for URL canonicalization benchmarks.
+        sitemap=True lists every page in gzipped sitemaps behind a sitemap
+        index named in robots.txt; disallow adds robots.txt Disallow paths.
+        downloads=True links every page to a PDF, a ZIP served from a URL
+        without extension and a 3 MB HTML page sent without
+        Content-Length, for content gating benchmarks.
+        http2=True serves HTTP/2 over plain TCP (prior knowledge, no
+        HTTP/1.1) instead of HTTP/1.1; needs the h2 package.
+        connections_opened counts the client connections accepted.
+        """
+        self.num_pages = num_pages
+        self.fan_out = fan_out
+        self.paragraphs = paragraphs
+        if latency_profile not in LATENCY_PROFILES:
+            raise ValueError(f"Unknown latency_profile: {latency_profile}")
+        self.latency = latency
+        self.latency_profile = latency_profile
+        self.seed = seed
+        self.crawl_delay = crawl_delay
+        self.print_views = print_views
+        self.url_variants = url_variants
+        self.sitemap = sitemap
+        self.disallow = tuple(disallow)
+        self.downloads = downloads
+        self.http2 = http2
+        self.requests_served = 0
+        self.connections_opened = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def page_url(self, idx: int) -> str:
+        """Path of page number idx (page 0 is the home page)."""
+        return '/' if idx == 0 else f'/page/{idx}.html'
+
+    def link_variant(self, idx: int, rng) -> str:
+        """One of the equivalent spellings of page idx's URL."""
+        url = self.page_url(idx)
+        variant = rng.randrange(5)
+        if variant == 1:
+            return url + '?utm_source=fixture&utm_medium=link'
+        if variant == 2:
+            return url + '#section'
+        if variant == 3:
+            if idx == 0:
+                return '/index.html'
+            return '/page/' + ''.join(f'%{ord(c):02x}' for c in str(idx)) + '.html'  # %31%32.html
+        if variant == 4 and idx:
+            return f'/go/{idx}'
+        return url
+
+    def render(self, idx: int, print_view: bool = False) -> bytes:
+        """Render page number idx (or its print view) as HTML bytes."""
+        rng = random.Random(self.seed * 1000003 + idx)
+
+        # Always link to the next page so the whole site is reachable
+        targets = [(idx + 1) % self.num_pages]
+        targets += [rng.randrange(self.num_pages) for _ in range(self.fan_out - 1)]
+        if self.url_variants:
+            # Separate generator so the page text stays the same
+            variant_rng = random.Random(self.seed * 7919 + idx)
+            hrefs = [self.link_variant(t, variant_rng) for t in targets]
+        else:
+            hrefs = [self.page_url(t) for t in targets]
+        links = ''.join(
+            f'<li><a href="{href}">Page {t} link</a></li>' for href, t in zip(hrefs, targets)
+        )
+        if self.print_views and not print_view:
+            links += f'<li><a href="/print/{idx}.html">Print page {idx}</a></li>'
+        if self.downloads:
+            links += (f'<li><a href="/files/{idx}.pdf">PDF {idx}</a></li>'
+                      f'<li><a href="/download/{idx}">Download {idx}</a></li>'
+                      f'<li><a href="/stream/{idx}">Full log {idx}</a></li>')
+        title = f'Fixture page {idx}' + (' (print view)' if print_view else '')
+        paras = ''.join(
+            '<p>' + ' '.join(rng.choice(WORDS) for _ in range(60)) + '</p>'
+            for _ in range(self.paragraphs)
+        )
+        html = (
+            f'<!DOCTYPE html><html><head><title>{title}</title>'
+            f'<meta name="description" content="Synthetic page {idx}"></head>'
+            f'<body><nav><a href="/">Home</a></nav><main>'
+            f'<h1>Fixture page {idx}</h1><h2>Section</h2>{paras}'
+            f'<ul>{links}</ul><img src="/img/{idx}.png" alt="Image {idx}">'
+            f'</main><footer>Fixture footer</footer></body></html>'
+        )
+        return html.encode('utf-8')
+
+    def robots_txt(self, host: str = '127.0.0.1') -> bytes:
+        """Render robots.txt."""
+        lines = ['User-agent: *']
+        lines += [f'Disallow: {path}' for path in self.disallow] or ['Disallow:']
+        if self.crawl_delay:
+            lines.append(f'Crawl-delay: {self.crawl_delay}')
+        if self.sitemap:
+            lines.append(f'Sitemap: http://{host}/sitemap.xml')
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+    def sitemap_index(self, host: str) -> bytes:
+        """Render the sitemap index pointing at the gzipped sitemaps."""
+        entries = ''.join(
+            f'<sitemap><loc>http://{host}/sitemaps/{k}.xml.gz</loc></sitemap>'
+            for k in range((self.num_pages + SITEMAP_SIZE - 1) // SITEMAP_SIZE)
+        )
+        return (f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="{SITEMAP_NS}">'
+                f'{entries}</sitemapindex>').encode('utf-8')
+
+    def sitemap_chunk(self, host: str, k: int) -> bytes:
+        """Render gzipped sitemap number k (SITEMAP_SIZE pages each)."""
+        entries = []
+        for idx in range(k * SITEMAP_SIZE, min((k + 1) * SITEMAP_SIZE, self.num_pages)):
+            priority = 1.0 if idx == 0 else round(0.1 + 0.8 * random.Random(idx).random(), 1)
+            entries.append(
+                f'<url><loc>http://{host}{self.page_url(idx)}</loc>'
+                f'<lastmod>2024-01-{idx % 28 + 1:02d}</lastmod><priority>{priority}</priority></url>'
+            )
+        xml = (f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="{SITEMAP_NS}">'
+               f'{"".join(entries)}</urlset>')
+        return gzip.compress(xml.encode('utf-8'), mtime=0)
+
+    def download(self, path: str):
+        """(content type, body, send Content-Length) for a download path, or None."""
+        kind, _, idx = path.strip('/').partition('/')
+        if kind == 'files' and idx.endswith('.pdf'):
+            return 'application/pdf', b'%PDF-1.4\n' + bytes(200 * 1024), True
+        if kind == 'download' and idx.isdigit():
+            return 'application/zip', b'PK\x03\x04' + bytes(500 * 1024), True
+        if kind == 'stream' and idx.isdigit():
+            line = '<p>' + ' '.join(WORDS) + '</p>\n'
+            body = f'<html><body>{line * (3 * 1024 * 1024 // len(line))}</body></html>'
+            return 'text/html; charset=utf-8', body.encode('utf-8'), False
+        return None
+
+    def delay(self, path: str) -> float:
+        """Seconds to wait before answering path (see latency_profile)."""
+        if self.latency_profile == 'fixed':
+            return self.latency
+        rng = random.Random(f'{self.seed}:{path}')
+        if self.latency_profile == 'uniform':
+            return 2 * self.latency * rng.random()
+        # Pareto with alpha 2 has mean 2
+        return min(self.latency * rng.paretovariate(2) / 2, 20 * self.latency)
+
+    def _page_index(self, path: str):
+        """Map a request path back to (page number, print view), or None."""
+        if path == '/' or (self.url_variants and path == '/index.html'):
+            return 0, False
+        for prefix, print_view in (('/page/', False), ('/print/', True)):
+            if path.startswith(prefix) and path.endswith('.html'):
+                if print_view and not self.print_views:
+                    return None
+                try:
+                    idx = int(path[len(prefix):-len('.html')])
+                except ValueError:
+                    return None
+                if (0 < idx or print_view) and idx < self.num_pages:
+                    return idx, print_view
+        return None
+
+    def respond(self, raw_path: str, request_headers) -> tuple:
+        """(status, headers, body) answering a GET of raw_path.
+
+        headers is a list of (name, value). A body without Content-Length
+        (streamed downloads) ends when the connection closes.
+        """
+        self.requests_served += 1
+        path = unquote(raw_path.split('?')[0])
+        if self.latency:
+            time.sleep(self.delay(path))
+        if self.url_variants and path.startswith('/go/'):
+            # Short link: redirect to the page
+            return 301, [('Location', f"/page/{path[len('/go/'):]}.html"),
+                         ('Content-Length', '0')], b''
+        host = request_headers.get('Host', '127.0.0.1')
+        download = self.download(path) if self.downloads else None
+        if download:
+            content_type, body, send_length = download
+            headers = [('Content-Type', content_type)]
+            if send_length:
+                headers.append(('Content-Length', str(len(body))))
+            return 200, headers, body
+
+        page = self._page_index(path)
+        if path == '/robots.txt':
+            status, headers, body = 200, [('Content-Type', 'text/plain')], self.robots_txt(host)
+        elif self.sitemap and path == '/sitemap.xml':
+            status, headers, body = 200, [('Content-Type', 'application/xml')], self.sitemap_index(host)
+        elif (self.sitemap and path.startswith('/sitemaps/') and path.endswith('.xml.gz')
+              and path[len('/sitemaps/'):-len('.xml.gz')].isdigit()):
+            body = self.sitemap_chunk(host, int(path[len('/sitemaps/'):-len('.xml.gz')]))
+            status, headers = 200, [('Content-Type', 'application/gzip')]
+        elif page is None:
+            status, headers, body = 404, [('Content-Type', 'text/plain')], b'Not found'
+        else:
+            body = self.render(*page)
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if request_headers.get('If-None-Match') == etag:
+                return 304, [('ETag', etag), ('Content-Length', '0')], b''
+            status = 200
+            headers = [('Content-Type', 'text/html; charset=utf-8'), ('ETag', etag)]
+        headers.append(('Content-Length', str(len(body))))
+        return status, headers, body
+
+    def _make_handler(self):
+        """Build the HTTP/1.1 request handler class bound to this site."""
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are separate writes: without TCP_NODELAY the
+            # body waits for the client's delayed ACK (~40 ms per request)
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with site._lock:
+                    site.connections_opened += 1
+
+            def do_GET(self):
+                status, headers, body = site.respond(self.path, self.headers)
+                self.send_response(status)
+                for name, value in headers:
+                    self.send_header(name, value)
+                if not any(name == 'Content-Length' for name, _ in headers):
+                    # Body ends when the connection closes
+                    self.send_header('Connection', 'close')
+                    self.close_connection = True
+                self.end_headers()
+                self.wfile.write(body)
+
+            def handle(self):
+                try:
+                    super().handle()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client hung up (e.g. a skipped download)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _make_h2_protocol(self):
+        """Build the asyncio protocol class serving this site over HTTP/2."""
+        import h2.config
+        import h2.connection
+        import h2.events
+        import h2.exceptions
+        site = self
+
+        class H2Protocol(asyncio.Protocol):
+            def connection_made(self, transport):
+                with site._lock:
+                    site.connections_opened += 1
+                self.transport = transport
+                self.conn = h2.connection.H2Connection(
+                    h2.config.H2Configuration(client_side=False, header_encoding='utf-8'))
+                self.conn.initiate_connection()
+                self.window_waiters = []
+                self.flush()
+
+            def flush(self):
+                if not self.transport.is_closing():
+                    self.transport.write(self.conn.data_to_send())
+
+            def data_received(self, data):
+                try:
+                    events = self.conn.receive_data(data)
+                except h2.exceptions.ProtocolError:
+                    self.flush()
+                    self.transport.close()
+                    return
+                for event in events:
+                    if isinstance(event, h2.events.RequestReceived):
+                        asyncio.ensure_future(self.answer(event.stream_id, dict(event.headers)))
+                    elif isinstance(event, (h2.events.WindowUpdated, h2.events.StreamReset)):
+                        self.wake_senders()
+                self.flush()
+
+            def connection_lost(self, exc):
+                self.wake_senders()
+
+            def wake_senders(self):
+                for waiter in self.window_waiters:
+                    waiter.set()
+                self.window_waiters = []
+
+            async def answer(self, stream_id, headers):
+                request_headers = {name.title(): value for name, value in headers.items()
+                                   if not name.startswith(':')}
+                request_headers['Host'] = headers.get(':authority', '127.0.0.1')
+                # respond() sleeps for the latency, so it runs on a thread
+                status, response_headers, body = await asyncio.get_running_loop().run_in_executor(
+                    site._executor, site.respond, headers[':path'], request_headers)
+                try:
+                    self.conn.send_headers(stream_id, [(':status', str(status))] + [
+                        (name.lower(), value) for name, value in response_headers])
+                    await self.send_body(stream_id, memoryview(body))
+                except h2.exceptions.ProtocolError:
+                    pass  # Client reset the stream (e.g. a skipped download)
+                self.flush()
+
+            async def send_body(self, stream_id, body):
+                """Send body as DATA frames, waiting whenever flow control says so."""
+                while body:
+                    size = min(self.conn.local_flow_control_window(stream_id),
+                               self.conn.max_outbound_frame_size, len(body))
+                    if size <= 0:
+                        if self.transport.is_closing():
+                            return
+                        waiter = asyncio.Event()
+                        self.window_waiters.append(waiter)
+                        await waiter.wait()
+                        continue
+                    self.conn.send_data(stream_id, bytes(body[:size]))
+                    body = body[size:]
+                    self.flush()
+                self.conn.end_stream(stream_id)
+
+        return H2Protocol
+
+    def start(self) -> str:
+        """Start serving in a background thread and return the base URL."""
+        if self.http2:
+            self._loop = asyncio.new_event_loop()
+            self._executor = ThreadPoolExecutor(max_workers=256)
+            self._server = self._loop.run_until_complete(
+                self._loop.create_server(self._make_h2_protocol(), '127.0.0.1', 0))
+            self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+            self._thread.start()
+            return f'http://127.0.0.1:{self._server.sockets[0].getsockname()[1]}/'
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler(),
+                                           bind_and_activate=False)
+        self._server.daemon_threads = True
+        # Room for many clients connecting at once (e.g. without keep-alive)
+        self._server.request_queue_size = 128
+        self._server.server_bind()
+        self._server.server_activate()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return f'http://127.0.0.1:{self._server.server_address[1]}/'
+
+    def stop(self):
+        """Stop the server."""
+        if self._server and self.http2:
+            self._loop.call_soon_threadsafe(self._server.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._executor.shutdown(wait=False)
+            self._server = None
+        elif self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
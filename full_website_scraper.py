@@ -13,46 +13,234 @@ Usage:
 
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-import json
+from bs4.element import CData, NavigableString, Tag
+from urllib.parse import urldefrag, urljoin, urlparse
+from urllib.robotparser import RobotFileParser
 import re
 from pathlib import Path
 from datetime import datetime
 from tqdm import tqdm
 import webbrowser
 import time
+import asyncio
+import collections
+import contextlib
+import itertools
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from crawl_frontier import CrawlFrontier
+from rate_limiter import HostRateLimiter
+from http_cache import HTTPCache
+from crawl_state import CrawlState
+import lxml_extractor
+from page_sinks import as_sink
+from simple_html_generator import generate_html, write_pages_json
+from content_analyzer import ContentAnalyzer
+from url_canonicalizer import URLCanonicalizer
+from sitemaps import iter_sitemap_urls
+from content_gate import ContentGate
+from http_transport import RequestsTransport
+from warc_archive import WARCWriter, iter_warc_responses
+
+
+THROTTLE_STATUSES = (429, 503)
+# Returned instead of a result when the server asked us to slow down
+THROTTLED = 'throttled'
 
 
 class FullWebsiteScraper:
     """Complete website content scraper."""
     
-    def __init__(self, base_url: str, max_pages: int = 50):
-        """Initialize scraper."""
+    def __init__(self, base_url: str, max_pages: int = 50, priority: str = 'bfs',
+                 max_links_per_page: int = None, polite: bool = True,
+                 cache_dir: str = None, state_db: str = None, backend: str = 'bs4',
+                 retain_pages: bool = True, near_duplicates: str = None,
+                 follow_duplicate_links: bool = True, canonicalizer: URLCanonicalizer = None,
+                 sitemaps: bool = False, max_sitemap_urls: int = 100000,
+                 content_gate: ContentGate = None, transport=None, warc_dir: str = None,
+                 max_throttle_retries: int = 3):
+        """Initialize scraper.
+        
+        priority picks the crawl order (see crawl_frontier.POLICIES) and
+        max_links_per_page optionally caps how many new links one page adds.
+        polite=False turns off rate limiting (only for your own servers).
+        cache_dir enables the conditional-GET HTTP cache for re-crawls.
+        state_db saves crawl progress to SQLite so scrape(resume=True) can
+        continue an interrupted crawl.
+        backend is 'bs4' (BeautifulSoup, most lenient) or 'lxml' (faster,
+        see lxml_extractor.py); both produce the same page schema.
+        retain_pages=False keeps scraped_pages empty: pages only go to the
+        registered sinks (see add_sink), so memory stays flat.
+        near_duplicates='mark' adds 'duplicate_of' to pages whose text is
+        nearly identical to an earlier page (SimHash, see
+        near_duplicates.py); 'drop' skips them so they do not use up
+        max_pages. follow_duplicate_links=False also ignores their links.
+        canonicalizer decides which URL spellings are the same page
+        (default: URLCanonicalizer(base_url), see url_canonicalizer.py).
+        sitemaps=True seeds a new crawl with up to max_sitemap_urls pages
+        from the sitemaps named in robots.txt (see sitemaps.py). URLs that
+        robots.txt disallows are never queued.
+        content_gate skips non-HTML and oversized downloads (default:
+        ContentGate(), 10 MB limit, see content_gate.py).
+        transport is the HTTP client (default: RequestsTransport(), pooled
+        HTTP/1.1; HTTPXTransport() multiplexes requests over HTTP/2, see
+        http_transport.py).
+        URLs answered with 429/503 are queued again, up to
+        max_throttle_retries times; with polite=True the retry waits until
+        the response's Retry-After has passed.
+        warc_dir archives every downloaded page (headers and body) in
+        .warc.gz files in that folder; replay_warc() re-extracts them
+        without the network (see warc_archive.py).
+        """
+        if backend not in ('bs4', 'lxml'):
+            raise ValueError(f"Unknown backend: {backend}")
+        if near_duplicates not in (None, 'mark', 'drop'):
+            raise ValueError(f"Unknown near_duplicates mode: {near_duplicates}")
         self.base_url = base_url
         self.domain = urlparse(base_url).netloc
         self.max_pages = max_pages
+        self.priority = priority
+        self.max_links_per_page = max_links_per_page
+        self.backend = backend
+        self.retain_pages = retain_pages
         self.visited_urls = set()
         self.scraped_pages = []
-        self.session = self._create_session()
-        
-    def _create_session(self):
-        """Create session with headers."""
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        })
-        return session
+        self.page_count = 0
+        self.sinks = []
+        self.frontier = None
+        self.robots = None
+        self.rate_limiter = HostRateLimiter() if polite else None
+        self.http_cache = HTTPCache(cache_dir) if cache_dir else None
+        self.crawl_state = CrawlState(state_db) if state_db else None
+        self.near_duplicates = near_duplicates
+        self.follow_duplicate_links = follow_duplicate_links
+        self.duplicate_index = None
+        if near_duplicates:
+            from near_duplicates import NearDuplicateIndex  # needs numpy
+            self.duplicate_index = NearDuplicateIndex()
+        self.duplicate_count = 0
+        self.canonicalizer = canonicalizer or URLCanonicalizer(base_url)
+        self.fetches_saved = 0
+        self.alias_count = 0
+        self._link_keys = set()
+        self.sitemaps = sitemaps
+        self.max_sitemap_urls = max_sitemap_urls
+        self.sitemap_stats = {}
+        self.robots_blocked = 0
+        self.content_gate = content_gate or ContentGate()
+        self.transport = transport or RequestsTransport()
+        self.warc = WARCWriter(warc_dir) if warc_dir else None
+        self.max_throttle_retries = max_throttle_retries
+        self.throttle_retries = {}
     
     def fetch_page(self, url: str):
         """Fetch page content."""
+        fetched = self._fetch_content(url)
+        if fetched in (None, THROTTLED) or fetched['content'] is None:
+            return None
+        return self.parse_content(fetched['content'])
+    
+    def _fetch_content(self, url: str):
+        """Download a page (network only, no parsing).
+        
+        Returns a dict with the raw 'content' bytes, the response
+        'content_type' and the final 'url' after redirects, or None on
+        failure or when content_gate skips the response. A redirect to a
+        page that was already scraped is not followed; 'content' is None
+        then. A 429/503 answer returns THROTTLED.
+        
+        http_cache entries are keyed on the final URL; redirects are then
+        followed hop by hop so every request carries the validators of
+        the URL it asks for.
+        """
+        start = time.monotonic()
+        response = None
         try:
-            response = self.session.get(url, timeout=15)
+            # Streamed, so content_gate sees the headers before the body
+            hop_by_hop = self.canonicalizer.redirects or self.http_cache is not None
+            response = self.transport.get(url, headers=self._conditional_headers(url),
+                                          timeout=15, stream=True, allow_redirects=not hop_by_hop)
+            response = self._follow_redirects(response)
+            if response.is_redirect:
+                return {'content': None, 'content_type': '', 'url': response.url}
+            if response.status_code == 304 and self.http_cache:
+                cached = self.http_cache.load(response.url)
+                if cached is not None:
+                    if self.warc:
+                        self.warc.write_response(response.url, 200,
+                                                 {'Content-Type': cached[1]}, cached[0])
+                    return {'content': cached[0], 'content_type': cached[1],
+                            'url': response.url}
+                # Cache entry vanished: fetch the full page again
+                final_url = response.url
+                response.close()
+                response = None
+                response = self.transport.get(final_url, timeout=15, stream=True)
+            if response.status_code in THROTTLE_STATUSES:
+                return THROTTLED
             response.raise_for_status()
-            return BeautifulSoup(response.content, 'lxml')
+            content = self.content_gate.read(response)
+            if content is None:
+                return None
+            if self.http_cache:
+                self.http_cache.store(response.url, response.headers, content)
+            if self.warc:
+                self.warc.write_response(response.url, response.status_code,
+                                         response.headers, content)
+            return {'content': content,
+                    'content_type': response.headers.get('Content-Type', ''),
+                    'url': response.url}
         except Exception as e:
             print(f"  ❌ Error: {str(e)[:50]}")
             return None
+        finally:
+            if self.rate_limiter:
+                self.rate_limiter.record(
+                    url, time.monotonic() - start,
+                    response.status_code if response is not None else None,
+                    response.headers.get('Retry-After') if response is not None else None,
+                )
+            if response is not None:
+                response.close()
+    
+    def _follow_redirects(self, response):
+        """Follow redirects one hop at a time, stopping before scraped pages.
+        
+        Returns the final response, or the redirect whose target (its
+        .url is set to the target) was already scraped. Scraped targets
+        are only checked with canonicalizer.redirects on.
+        """
+        for _ in range(self.transport.max_redirects):
+            if not response.is_redirect:
+                return response
+            target = urljoin(response.url, response.headers['Location'])
+            if (self.canonicalizer.redirects and self.canonicalizer.is_internal(target)
+                    and self.canonicalizer.canonicalize(target) in self.visited_urls):
+                response.url = target
+                return response
+            response.close()
+            response = self.transport.get(target, headers=self._conditional_headers(target),
+                                          timeout=15, stream=True, allow_redirects=False)
+        raise requests.TooManyRedirects(f"Exceeded {self.transport.max_redirects} redirects")
+    
+    def _conditional_headers(self, url: str) -> dict:
+        """If-None-Match / If-Modified-Since for url's http_cache entry, if any."""
+        return self.http_cache.conditional_headers(url) if self.http_cache else {}
+    
+    def parse_content(self, content: bytes) -> BeautifulSoup:
+        """Parse raw page bytes."""
+        return BeautifulSoup(content, 'lxml')
+    
+    def extract_from_content(self, content: bytes, url: str, content_type: str = ''):
+        """Parse raw bytes and return (page_content, internal_links)."""
+        if self.backend == 'lxml':
+            doc = lxml_extractor.parse_html(content, content_type)
+            page_content = lxml_extractor.extract_page(doc, url, self.clean_text)
+            return page_content, self._filter_internal_links(lxml_extractor.link_hrefs(doc), url)
+        
+        soup = self.parse_content(content)
+        page_content = self.extract_page_content(soup, url)
+        return page_content, self.find_internal_links(soup, url)
     
     def clean_text(self, text: str) -> str:
         """Clean text content."""
@@ -61,11 +249,19 @@ class FullWebsiteScraper:
         text = re.sub(r'\s+', ' ', text)
         return text.strip()
     
+    # Elements removed before extraction (and skipped by the single walk)
+    SKIP_TAGS = {'script', 'style', 'nav', 'footer', 'header', 'aside'}
+    HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+    MAX_LINKS = 50
+    MAX_IMAGES = 20
+    
     def extract_page_content(self, soup: BeautifulSoup, url: str) -> dict:
-        """Extract complete page content."""
-        # Remove unwanted elements
-        for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-            element.decompose()
+        """Extract complete page content.
+        
+        Collects everything in one walk of the tree. The output is identical
+        to the multi-pass extract_page_content_reference in benchmark.py.
+        """
+        walk = self._walk_page(soup, url)
         
         content = {
             'url': url,
@@ -73,137 +269,744 @@ class FullWebsiteScraper:
         }
         
         # Title
-        title = soup.find('title')
-        if title:
-            content['title'] = self.clean_text(title.get_text())
+        if walk['title'] is not None:
+            content['title'] = self.clean_text(''.join(walk['title']))
         else:
             content['title'] = url
         
         # Meta description
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc:
-            content['meta_description'] = meta_desc.get('content', '')
+        if walk['meta_description'] is not None:
+            content['meta_description'] = walk['meta_description']
+        
+        # Canonical URL the page declares (<link rel="canonical">)
+        if walk['canonical_url'] is not None:
+            content['canonical_url'] = walk['canonical_url']
         
         # Main heading
-        h1 = soup.find('h1')
-        if h1:
-            content['main_heading'] = self.clean_text(h1.get_text())
+        if walk['h1'] is not None:
+            content['main_heading'] = self.clean_text(''.join(walk['h1']))
         
         # All headings
         headings = []
-        for h in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-            heading_text = self.clean_text(h.get_text())
+        for level, parts in walk['headings']:
+            heading_text = self.clean_text(''.join(parts))
             if heading_text:
                 headings.append({
-                    'level': h.name,
+                    'level': level,
                     'text': heading_text
                 })
         content['headings'] = headings
         
         # All paragraphs
         paragraphs = []
-        for p in soup.find_all('p'):
-            para_text = self.clean_text(p.get_text())
+        for parts in walk['paragraphs']:
+            para_text = self.clean_text(''.join(parts))
             if para_text and len(para_text) > 20:
                 paragraphs.append(para_text)
         content['paragraphs'] = paragraphs
         
         # Lists
         lists = []
-        for ul in soup.find_all(['ul', 'ol']):
-            items = [self.clean_text(li.get_text()) for li in ul.find_all('li')]
+        for list_items in walk['lists']:
+            items = [self.clean_text(''.join(parts)) for parts in list_items]
             items = [item for item in items if item]
             if items:
                 lists.append(items)
         content['lists'] = lists
         
-        # Links
-        links = []
-        for a in soup.find_all('a', href=True):
-            link_text = self.clean_text(a.get_text())
-            link_url = urljoin(url, a['href'])
-            if link_text and link_url:
-                links.append({'text': link_text, 'url': link_url})
-        content['links'] = links[:50]  # Limit to 50 links
+        # Links (text was cleaned during the walk to know when to stop)
+        content['links'] = [link for link in walk['links'] if link['text']][:self.MAX_LINKS]
         
         # Images
-        images = []
-        for img in soup.find_all('img', src=True):
-            img_url = urljoin(url, img['src'])
-            img_alt = img.get('alt', '')
-            images.append({'url': img_url, 'alt': img_alt})
-        content['images'] = images[:20]  # Limit to 20 images
+        content['images'] = walk['images']
         
         # Full text content
-        main_content = soup.find('main') or soup.find('article') or soup.find('body')
-        if main_content:
-            content['full_text'] = self.clean_text(main_content.get_text())
+        main_parts = next((walk[name] for name in ('main', 'article', 'body')
+                           if walk[name] is not None), None)
+        if main_parts is not None:
+            content['full_text'] = self.clean_text(''.join(main_parts))
         else:
-            content['full_text'] = self.clean_text(soup.get_text())
+            content['full_text'] = self.clean_text(''.join(walk['document']))
         
         return content
     
-    def find_internal_links(self, soup: BeautifulSoup, current_url: str):
-        """Find internal links to scrape."""
-        links = set()
-        for a in soup.find_all('a', href=True):
-            url = urljoin(current_url, a['href'])
-            parsed = urlparse(url)
+    def _walk_page(self, soup: BeautifulSoup, url: str) -> dict:
+        """Single pre-order walk collecting the raw text of every field.
+        
+        Each open element of interest (title, h1-h6, p, li, a, main, ...)
+        has a text buffer; every string is appended to all open buffers that
+        get_text() on that element would include it in. SKIP_TAGS subtrees
+        are not entered and are decomposed afterwards, as before.
+        """
+        found = {'title': None, 'meta_description': None, 'canonical_url': None, 'h1': None,
+                 'main': None, 'article': None, 'body': None,
+                 'headings': [], 'paragraphs': [], 'lists': [], 'links': [], 'images': []}
+        found['document'] = []
+        active = [(found['document'], _string_types(soup))]
+        open_lists = []
+        accepted_links = 0
+        skipped = []
+        
+        # Stack frames: [child iterator, buffers opened, (kind, data) to close]
+        stack = [[iter(soup.contents), 0, None]]
+        while stack:
+            frame = stack[-1]
+            node = next(frame[0], None)
+            
+            if node is None:
+                stack.pop()
+                if frame[1]:
+                    del active[-frame[1]:]
+                if frame[2]:
+                    kind, data = frame[2]
+                    if kind == 'list':
+                        open_lists.pop()
+                    elif kind == 'link':
+                        data['text'] = self.clean_text(''.join(data['text']))
+                        if data['text']:
+                            accepted_links += 1
+                continue
+            
+            if isinstance(node, NavigableString):
+                node_type = type(node)
+                for parts, types in active:
+                    if node_type in types:
+                        parts.append(node)
+                continue
+            
+            if not isinstance(node, Tag):
+                continue
+            
+            name = node.name
+            if name in self.SKIP_TAGS:
+                skipped.append(node)
+                continue
+            
+            buffers = []
+            closer = None
+            
+            if name == 'title':
+                if found['title'] is None:
+                    found['title'] = []
+                    buffers.append(found['title'])
+            elif name == 'meta':
+                if found['meta_description'] is None and node.get('name') == 'description':
+                    found['meta_description'] = node.get('content', '')
+            elif name == 'link':
+                href = node.get('href')
+                if (found['canonical_url'] is None and href is not None
+                        and 'canonical' in (node.get('rel') or ())):
+                    found['canonical_url'] = urljoin(url, href)
+            elif name in self.HEADING_TAGS:
+                parts = []
+                found['headings'].append((name, parts))
+                buffers.append(parts)
+                if name == 'h1' and found['h1'] is None:
+                    found['h1'] = parts
+            elif name == 'p':
+                parts = []
+                found['paragraphs'].append(parts)
+                buffers.append(parts)
+            elif name in ('ul', 'ol'):
+                items = []
+                found['lists'].append(items)
+                open_lists.append(items)
+                closer = ('list', None)
+            elif name == 'li':
+                if open_lists:
+                    parts = []
+                    # An <li> belongs to every list it is nested in
+                    for items in open_lists:
+                        items.append(parts)
+                    buffers.append(parts)
+            elif name == 'a':
+                href = node.get('href')
+                if href is not None and accepted_links < self.MAX_LINKS:
+                    link = {'text': [], 'url': urljoin(url, href)}
+                    found['links'].append(link)
+                    buffers.append(link['text'])
+                    closer = ('link', link)
+            elif name == 'img':
+                src = node.get('src')
+                if src is not None and len(found['images']) < self.MAX_IMAGES:
+                    found['images'].append({'url': urljoin(url, src), 'alt': node.get('alt', '')})
+            elif name in ('main', 'article', 'body'):
+                if found[name] is None:
+                    found[name] = []
+                    buffers.append(found[name])
             
-            # Only same domain
-            if parsed.netloc == self.domain:
-                # Remove fragments and query params for deduplication
-                clean_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-                if clean_url not in self.visited_urls:
-                    links.add(clean_url)
+            types = _string_types(node) if buffers else None
+            for parts in buffers:
+                active.append((parts, types))
+            stack.append([iter(node.contents), len(buffers), closer])
+        
+        # Same side effect as before: find_internal_links runs on the
+        # tree without these elements
+        for element in skipped:
+            element.decompose()
+        
+        return found
+    
+    def find_internal_links(self, soup: BeautifulSoup, current_url: str):
+        """Find internal links to scrape (in page order)."""
+        return self._filter_internal_links(
+            (a['href'] for a in soup.find_all('a', href=True)), current_url
+        )
+    
+    def _filter_internal_links(self, hrefs, current_url: str) -> list:
+        """Turn raw href values into absolute same-site URLs.
+        
+        Fragments are removed; everything else is canonicalized when the
+        links are queued (see _enqueue_links).
+        """
+        links = {}
+        for href in hrefs:
+            url = urldefrag(urljoin(current_url, href))[0]
+            if self.canonicalizer.is_internal(url):
+                links[url] = None
         
         return list(links)
     
-    def scrape(self):
-        """Main scraping method."""
+    def add_sink(self, sink):
+        """Send every new page to sink (a page_sinks object or a function).
+        
+        Sinks are flushed when a crawl ends but stay open, so one sink can
+        take several crawls; closing it is up to the caller.
+        """
+        self.sinks.append(as_sink(sink))
+        return sink
+    
+    def scrape(self, resume: bool = False):
+        """Main scraping method.
+        
+        resume=True continues the crawl saved in state_db instead of
+        starting over.
+        """
+        for _ in self.iter_scrape(resume):
+            pass
+        return self.scraped_pages
+    
+    def iter_scrape(self, resume: bool = False):
+        """Same crawl as scrape(), but yields each page as it is extracted."""
         print("🚀 Starting Full Website Scraper...")
         print(f"📍 Target: {self.base_url}")
         print(f"📄 Max pages: {self.max_pages}\n")
         
-        urls_to_visit = [self.base_url]
+        self._start_crawl(resume)
         
-        with tqdm(total=self.max_pages, desc="Scraping pages", unit="page") as pbar:
-            while urls_to_visit and len(self.scraped_pages) < self.max_pages:
-                current_url = urls_to_visit.pop(0)
-                
-                if current_url in self.visited_urls:
-                    continue
-                
-                # Fetch page
-                soup = self.fetch_page(current_url)
-                if not soup:
-                    continue
-                
-                self.visited_urls.add(current_url)
-                
-                # Extract content
-                page_content = self.extract_page_content(soup, current_url)
-                self.scraped_pages.append(page_content)
-                
-                pbar.update(1)
-                pbar.set_postfix({"pages": len(self.scraped_pages)})
+        try:
+            with tqdm(total=self.max_pages, initial=self.page_count,
+                      desc="Scraping pages", unit="page") as pbar:
+                while self.frontier and self.page_count < self.max_pages:
+                    current_url, depth, _ = self.frontier.pop()
+                    if self._already_scraped(current_url):
+                        continue
+                    
+                    # Fetch page and extract content
+                    if self.rate_limiter:
+                        self.rate_limiter.wait(current_url)
+                    result = self._fetch_and_extract(current_url)
+                    if not self._handle_result(current_url, depth, result):
+                        continue
+                    
+                    pbar.update(1)
+                    pbar.set_postfix({"pages": self.page_count})
+                    yield result[0]
+        finally:
+            self._finish_crawl()
+        
+        print(f"\n✅ Scraping complete!")
+        print(f"📊 Total pages scraped: {self.page_count}")
+        self._print_crawl_stats()
+    
+    def _start_crawl(self, resume: bool = False):
+        """Set up robots.txt and the frontier before scrape() / scrape_async()."""
+        if resume and not self.crawl_state:
+            raise ValueError("resume=True needs a state_db")
+        
+        self._load_robots()
+        self.frontier = CrawlFrontier(self.priority)
+        
+        if self.crawl_state and resume:
+            pending, seen, done = self.crawl_state.load()
+            if seen:
+                for url, depth, meta in pending:
+                    self.frontier.add(url, depth, meta)
+                for url in seen:
+                    self.frontier.mark_seen(url)
+                    self._link_keys.add(url.split('?', 1)[0])
+                for url, page in zip(done, self.crawl_state.iter_pages()):
+                    # Redirect targets and rel=canonical URLs are not saved
+                    self._register_aliases(url, page)
+                    self.visited_urls.add(url)
+                    if self.retain_pages:
+                        self.scraped_pages.append(page)
+                    if self.duplicate_index and 'duplicate_of' not in page:
+                        self.duplicate_index.check(page['url'], page.get('full_text', ''))
+                self.page_count += len(done)
+                print(f"♻️  Resuming: {len(done)} pages done, {len(pending)} URLs queued")
+                return
+        elif self.crawl_state:
+            self.crawl_state.reset()
+        
+        self._link_keys.add(self.base_url.split('?', 1)[0])
+        self._queue_url(self.canonicalizer.canonicalize(self.base_url), depth=0)
+        if self.sitemaps:
+            self._seed_from_sitemaps()
+    
+    def _seed_from_sitemaps(self):
+        """Queue the pages listed in the site's sitemaps, with their metadata."""
+        parsed = urlparse(self.base_url)
+        sitemap_urls = self.robots.site_maps() or [f"{parsed.scheme}://{parsed.netloc}/sitemap.xml"]
+        self.sitemap_stats = {'queued': 0}
+        for loc, meta in iter_sitemap_urls(sitemap_urls, self._stream_content,
+                                           stats=self.sitemap_stats):
+            if self.sitemap_stats['queued'] >= self.max_sitemap_urls:
+                break
+            if not self.canonicalizer.is_internal(loc):
+                continue
+            # Links to these pages found later are not fetches saved by canonicalization
+            self._link_keys.add(loc.split('?', 1)[0])
+            if self._queue_url(self.canonicalizer.canonicalize(loc), depth=1, meta=meta):
+                self.sitemap_stats['queued'] += 1
+        print(f"🗺️  Sitemaps: {self.sitemap_stats['sitemaps']} read, "
+              f"{self.sitemap_stats['queued']} URLs queued")
+    
+    def _stream_content(self, url: str):
+        """Fetch url and return its body as an iterator of chunks, or None on failure."""
+        if self.rate_limiter:
+            self.rate_limiter.wait(url)
+        start = time.monotonic()
+        try:
+            response = self.transport.get(url, stream=True, timeout=15)
+        except Exception as e:
+            print(f"  ❌ Error: {str(e)[:50]}")
+            return None
+        if self.rate_limiter:
+            self.rate_limiter.record(url, time.monotonic() - start, response.status_code,
+                                     response.headers.get('Retry-After'))
+        if response.status_code != 200:
+            response.close()
+            return None
+        
+        def chunks():
+            with response:
+                try:
+                    yield from response.iter_content(64 * 1024)
+                except Exception as e:
+                    print(f"  ❌ Error: {str(e)[:50]}")
+        return chunks()
+    
+    def _finish_crawl(self):
+        """Persist whatever is still buffered (also runs on Ctrl+C)."""
+        self._flush_sinks()
+        if self.crawl_state:
+            self.crawl_state.close()
+        if self.warc:
+            self.warc.close()
+    
+    def _flush_sinks(self):
+        for sink in self.sinks:
+            sink.flush()
+    
+    def _checkpoint(self):
+        """Call after each processed URL: sinks are flushed with each crawl_state commit."""
+        if self.crawl_state:
+            # Sinks first: a crash in between repeats pages rather than losing them
+            self.crawl_state.checkpoint(before_commit=self._flush_sinks)
+        else:
+            self._flush_sinks()
+    
+    def _load_robots(self):
+        """Fetch robots.txt and apply its Crawl-delay to the rate limiter."""
+        parsed = urlparse(self.base_url)
+        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+        self.robots = RobotFileParser(robots_url)
+        try:
+            response = self.transport.get(robots_url, timeout=15)
+            lines = response.text.splitlines() if response.status_code == 200 else []
+        except Exception:
+            lines = []
+        self.robots.parse(lines)
+        
+        if self.rate_limiter:
+            delay = self.robots.crawl_delay(self.transport.user_agent)
+            if delay:
+                print(f"🤖 robots.txt Crawl-delay: {delay}s")
+                self.rate_limiter.set_crawl_delay(self.base_url, float(delay))
+    
+    def _print_crawl_stats(self):
+        """Print end-of-crawl counters."""
+        if self.rate_limiter:
+            print(f"🐢 Final crawl rate: {self.rate_limiter.rate(self.base_url):.1f} req/s")
+        if self.http_cache:
+            print(f"💾 HTTP cache: {self.http_cache.summary()}")
+        if self.duplicate_index:
+            action = 'dropped' if self.near_duplicates == 'drop' else 'marked'
+            print(f"🧬 Near-duplicates {action}: {self.duplicate_count}")
+        if any(self.content_gate.skipped.values()):
+            print(f"🚧 Skipped: {self.content_gate.summary()}")
+        if self.throttle_retries:
+            print(f"🔁 Retried after 429/503: {len(self.throttle_retries)} URLs, "
+                  f"{sum(self.throttle_retries.values())} retries")
+        if self.robots_blocked:
+            print(f"🤖 Disallowed by robots.txt: {self.robots_blocked} URLs")
+        if self.fetches_saved or self.alias_count:
+            print(f"🔗 Canonical URLs: {self.fetches_saved} fetches saved, "
+                  f"{self.alias_count} pages already scraped under another URL")
+    
+    def _queue_url(self, url: str, depth: int, meta: dict = None) -> bool:
+        """Add url to the frontier (and the saved state) if it is new.
+        
+        URLs disallowed by robots.txt, or whose extension content_gate
+        skips, are not queued. Returns True if queued.
+        """
+        if url in self.frontier:
+            return False
+        if self.content_gate.skip_url(url):
+            self.frontier.mark_seen(url)
+            return False
+        if not self.robots.can_fetch(self.transport.user_agent, url):
+            self.frontier.mark_seen(url)
+            self.robots_blocked += 1
+            return False
+        self.frontier.add(url, depth, meta)
+        if self.crawl_state:
+            self.crawl_state.queued(url, depth, meta)
+        return True
+    
+    def _canonical_url(self, link: str) -> str:
+        """Canonical form of a found link; counts the fetches it saves.
+        
+        A fetch is saved when a link spelling the old scheme://host/path
+        dedup would have fetched turns out to be a page already known.
+        """
+        url = self.canonicalizer.canonicalize(link)
+        key = link.split('?', 1)[0]
+        if key not in self._link_keys:
+            self._link_keys.add(key)
+            if url in self.frontier:
+                self.fetches_saved += 1
+        return url
+    
+    def _enqueue_links(self, links: list, depth: int):
+        """Queue newly found links that have not been seen yet."""
+        new_links = {}
+        for link in links:
+            url = self._canonical_url(link)
+            if url not in self.visited_urls:
+                new_links[url] = None
+        links = list(new_links)
+        if self.max_links_per_page is not None:
+            links = links[:self.max_links_per_page]
+        for link in links:
+            self._queue_url(link, depth)
+    
+    def _fetch_and_extract(self, url: str):
+        """Fetch one page and return (page_content, internal_links), THROTTLED or None."""
+        fetched = self._fetch_content(url)
+        if fetched in (None, THROTTLED):
+            return fetched
+        if fetched['content'] is None:
+            return {'url': fetched['url']}, []  # redirect to a scraped page
+        # Relative links resolve against the final URL after redirects
+        return self.extract_from_content(fetched['content'], fetched['url'],
+                                         fetched['content_type'])
+    
+    def _add_page(self, url: str, page_content: dict):
+        """Record a successfully scraped page."""
+        self.visited_urls.add(url)
+        self.page_count += 1
+        if self.retain_pages:
+            self.scraped_pages.append(page_content)
+        for sink in self.sinks:
+            sink.write(page_content)
+        if self.crawl_state:
+            self.crawl_state.done(url, page_content)
+    
+    def _handle_result(self, url: str, depth: int, result) -> bool:
+        """Book-keep one fetched URL. Returns True if a page was added."""
+        if result == THROTTLED:
+            retries = self.throttle_retries.get(url, 0)
+            if retries < self.max_throttle_retries:
+                # Stays queued in crawl_state; the rate limiter holds the
+                # host back until Retry-After has passed
+                self.throttle_retries[url] = retries + 1
+                self.frontier.requeue(url, depth)
+                return False
+            print(f"  ❌ Still throttled after {retries} retries: {url[:60]}")
+            result = None
+        if not result:
+            if self.crawl_state:
+                self.crawl_state.failed(url)
+            return False
+        
+        page_content, new_links = result
+        if self._register_aliases(url, page_content):
+            # Same page as one already scraped (its links were queued then)
+            self.alias_count += 1
+            self.visited_urls.add(url)
+            if self.crawl_state:
+                self.crawl_state.duplicate(url)
+            self._checkpoint()
+            return False
+        
+        duplicate_of = self._keep_page(url, page_content)
+        
+        # Links are queued even after max_pages so a resumed crawl with a
+        # bigger limit still knows where to go next
+        if not duplicate_of or self.follow_duplicate_links:
+            self._enqueue_links(new_links, depth + 1)
+        self._checkpoint()
+        return not (duplicate_of and self.near_duplicates == 'drop')
+    
+    def _keep_page(self, url: str, page_content: dict):
+        """Add a new page, applying near-duplicate detection.
+        
+        Returns the URL of the earlier page it duplicates, or None.
+        """
+        duplicate_of = None
+        if self.duplicate_index:
+            duplicate_of = self.duplicate_index.check(url, page_content.get('full_text', ''))
+        
+        if duplicate_of:
+            self.duplicate_count += 1
+        if duplicate_of and self.near_duplicates == 'drop':
+            self.visited_urls.add(url)
+            if self.crawl_state:
+                self.crawl_state.duplicate(url)
+        else:
+            if duplicate_of:
+                page_content['duplicate_of'] = duplicate_of
+            self._add_page(url, page_content)
+        return duplicate_of
+    
+    def _already_scraped(self, url: str) -> bool:
+        """True if a queued URL turned out to be an alias of a scraped page."""
+        if url in self.visited_urls:
+            self.fetches_saved += 1
+            return True
+        return False
+    
+    def _register_aliases(self, url: str, page_content: dict) -> bool:
+        """Mark a page's redirect target and rel=canonical URL as visited.
+        
+        Returns True (and marks nothing) if one of them, or url itself, was
+        scraped already.
+        """
+        if url in self.visited_urls:
+            return True
+        aliases = []
+        if self.canonicalizer.redirects:
+            aliases.append(page_content['url'])
+        if self.canonicalizer.rel_canonical and page_content.get('canonical_url'):
+            aliases.append(page_content['canonical_url'])
+        aliases = {self.canonicalizer.canonicalize(alias) for alias in aliases
+                   if self.canonicalizer.is_internal(alias)}
+        aliases.discard(url)
+        if any(alias in self.visited_urls for alias in aliases):
+            return True
+        for alias in aliases:
+            self.visited_urls.add(alias)
+            self.frontier.mark_seen(alias)
+        return False
+    
+    def scrape_async(self, concurrency: int = 10, per_host_concurrency: int = 4,
+                     parse_workers: int = 0, parse_queue_size: int = None,
+                     resume: bool = False):
+        """Scrape with up to `concurrency` requests in flight.
+        
+        At most `per_host_concurrency` of them go to the same host. Pages
+        come from extract_page_content, so the dicts match scrape().
+        
+        With parse_workers > 0, parsing and extraction move to a process
+        pool. Fetched bytes wait in a parse queue of parse_queue_size
+        (default 2 * parse_workers); when it is full, fetching pauses.
+        resume works as in scrape(). Pages reach the registered sinks as
+        soon as they are extracted.
+        """
+        print("🚀 Starting Full Website Scraper (async engine)...")
+        print(f"📍 Target: {self.base_url}")
+        print(f"📄 Max pages: {self.max_pages}")
+        print(f"⚡ Concurrency: {concurrency} (max {per_host_concurrency} per host)")
+        if parse_workers:
+            print(f"🧩 Parse workers: {parse_workers}")
+        print()
+        
+        if self.transport.pool_size < concurrency:
+            self.transport.resize(concurrency)
+        self._start_crawl(resume)
+        try:
+            asyncio.run(self._scrape_async(concurrency, per_host_concurrency, parse_workers,
+                                           parse_queue_size or 2 * parse_workers))
+        finally:
+            self._finish_crawl()
+        
+        print(f"\n✅ Scraping complete!")
+        print(f"📊 Total pages scraped: {self.page_count}")
+        self._print_crawl_stats()
+        
+        return self.scraped_pages
+    
+    async def _scrape_async(self, concurrency: int, per_host_concurrency: int,
+                            parse_workers: int = 0, parse_queue_size: int = 0):
+        """Event loop side of scrape_async.
+        
+        Blocking fetches run on a thread pool; the visited set, frontier
+        and results are only touched from the loop.
+        """
+        loop = asyncio.get_running_loop()
+        host_slots = {}
+        parse_slots = asyncio.Semaphore(max(parse_queue_size, 1))
+        in_flight = {}
+        
+        async def fetch(url):
+            host = urlparse(url).netloc
+            if host not in host_slots:
+                host_slots[host] = asyncio.Semaphore(per_host_concurrency)
+            async with host_slots[host]:
+                if self.rate_limiter:
+                    await self.rate_limiter.wait_async(url)
+                if not parse_pool:
+                    return await loop.run_in_executor(executor, self._fetch_and_extract, url)
+                fetched = await loop.run_in_executor(executor, self._fetch_content, url)
+            if fetched in (None, THROTTLED):
+                return fetched
+            if fetched['content'] is None:
+                return {'url': fetched['url']}, []  # redirect to a scraped page
+            # Hand off to the parse stage. While it is full this task keeps
+            # its fetch slot, so no new requests start (backpressure).
+            async with parse_slots:
+                return await loop.run_in_executor(
+                    parse_pool, _parse_in_worker,
+                    fetched['content'], fetched['url'], fetched['content_type'],
+                )
+        
+        with contextlib.ExitStack() as stack:
+            executor = stack.enter_context(ThreadPoolExecutor(max_workers=concurrency))
+            parse_pool = None
+            if parse_workers:
+                parse_pool = stack.enter_context(ProcessPoolExecutor(
+                    max_workers=parse_workers,
+                    initializer=_init_parse_worker,
+                    initargs=(self.base_url, self.backend, self.canonicalizer),
+                ))
+            pbar = stack.enter_context(tqdm(
+                total=self.max_pages, initial=self.page_count,
+                desc="Scraping pages", unit="page",
+            ))
+            
+            while self.frontier or in_flight:
+                # Keep the pipe full, but never fetch more than max_pages needs
+                while (self.frontier and len(in_flight) < concurrency
+                       and self.page_count + len(in_flight) < self.max_pages):
+                    url, depth, _ = self.frontier.pop()
+                    if self._already_scraped(url):
+                        continue
+                    in_flight[asyncio.ensure_future(fetch(url))] = (url, depth)
                 
-                # Find more links
-                if len(self.scraped_pages) < self.max_pages:
-                    new_links = self.find_internal_links(soup, current_url)
-                    urls_to_visit.extend(new_links[:10])  # Add max 10 new links per page
+                if not in_flight:
+                    break
                 
-                # Be polite
-                time.sleep(1)
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    url, depth = in_flight.pop(task)
+                    if self.page_count >= self.max_pages:
+                        continue
+                    if not self._handle_result(url, depth, task.result()):
+                        continue
+                    
+                    pbar.update(1)
+                    pbar.set_postfix({"pages": self.page_count})
+    
+    def replay_warc(self, paths, workers: int = 0, batch_size: int = 16):
+        """Re-extract the pages archived with warc_dir, without any network.
         
-        print(f"\n✅ Scraping complete!")
-        print(f"📊 Total pages scraped: {len(self.scraped_pages)}")
+        paths are .warc.gz files (or folders of them). Every archived
+        page goes through the current extraction code in archive order,
+        and pages reach scraped_pages and the sinks as in a crawl; the
+        same archive always gives the same pages. max_pages, robots.txt
+        and the frontier play no part.
+        
+        With workers > 0, parsing runs in that many processes (the
+        scrape_async parse workers), batch_size pages per task.
+        """
+        files = []
+        for path in map(Path, [paths] if isinstance(paths, (str, Path)) else paths):
+            if path.is_dir():
+                files += sorted(path.glob('*.warc.gz')) + sorted(path.glob('*.warc'))
+            else:
+                files.append(path)
+        print("🚀 Replaying WARC archive...")
+        print(f"📦 Files: {len(files)}")
+        if workers:
+            print(f"🧩 Parse workers: {workers}")
+        print()
+        
+        self.frontier = CrawlFrontier(self.priority)
+        records = ((url, body, headers.get('Content-Type', ''), date)
+                   for url, status, headers, body, date in iter_warc_responses(files)
+                   if status == 200)
+        try:
+            with contextlib.ExitStack() as stack:
+                if workers:
+                    pool = stack.enter_context(ProcessPoolExecutor(
+                        max_workers=workers,
+                        initializer=_init_parse_worker,
+                        initargs=(self.base_url, self.backend, self.canonicalizer),
+                    ))
+                    results = _replay_in_pool(pool, records, workers, batch_size)
+                else:
+                    results = ((url, date, self.extract_from_content(body, url, content_type))
+                               for url, body, content_type, date in records)
+                pbar = stack.enter_context(tqdm(desc="Replaying pages", unit="page"))
+                for url, date, (page_content, _) in results:
+                    # Stamped with the download time, so replays are identical
+                    page_content['scraped_at'] = date.isoformat()
+                    url = self.canonicalizer.canonicalize(url)
+                    if self._register_aliases(url, page_content):
+                        self.alias_count += 1  # archived twice (e.g. two crawls)
+                        continue
+                    self._keep_page(url, page_content)
+                    self._checkpoint()
+                    pbar.update(1)
+        finally:
+            self._finish_crawl()
         
+        print(f"\n✅ Replay complete!")
+        print(f"📊 Total pages extracted: {self.page_count}")
+        if self.duplicate_index:
+            action = 'dropped' if self.near_duplicates == 'drop' else 'marked'
+            print(f"🧬 Near-duplicates {action}: {self.duplicate_count}")
         return self.scraped_pages
     
-    def generate_html_output(self, pages: list, output_file: str = "scraped_website.html"):
-        """Generate beautiful HTML output."""
-        html = f"""
+    def generate_html_output(self, pages: list, output_file: str = "scraped_website.html",
+                             shard_dir: str = None, shard_size: int = 100):
+        """Generate beautiful HTML output.
+        
+        The report is streamed to output_file page by page, so pages can
+        be a list or any re-iterable with len(), such as
+        page_sinks.JSONLPages.
+        
+        With shard_dir set, writes the sharded, on-demand report of
+        simple_html_generator.generate_html instead.
+        """
+        if shard_dir:
+            stats = ContentAnalyzer.analyze_pages(pages)
+            generate_html(pages, self.domain, stats, self.base_url, output_file,
+                          shard_dir=shard_dir, shard_size=shard_size)
+            print(f"💾 HTML output saved: {output_file}")
+            return output_file
+        
+        with open(output_file, 'w', encoding='utf-8', buffering=1 << 16) as out:
+            self._write_html_output(out, pages)
+        
+        print(f"💾 HTML output saved: {output_file}")
+        return output_file
+    
+    def _write_html_output(self, out, pages):
+        """Stream the generate_html_output report into the open file out."""
+        out.write(f"""
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -437,11 +1240,11 @@ class FullWebsiteScraper:
         <div class="toggle-all">
             <button class="btn" onclick="toggleAll()">Expand/Collapse All</button>
         </div>
-"""
+""")
         
         # Add each page
         for idx, page in enumerate(pages, 1):
-            html += f"""
+            out.write(f"""
         <div class="page-card">
             <div class="page-header" onclick="togglePage({idx})">
                 <div>
@@ -457,51 +1260,53 @@ class FullWebsiteScraper:
                     <div class="section-title">📝 Main Heading</div>
                     <h2>{page.get('main_heading', 'N/A')}</h2>
                 </div>
-"""
+""")
             
             # Headings
             if page.get('headings'):
-                html += '<div class="section"><div class="section-title">📋 All Headings</div>'
+                out.write('<div class="section"><div class="section-title">📋 All Headings</div>')
                 for h in page['headings'][:20]:
-                    html += f'<div class="heading {h["level"]}">{h["text"]}</div>'
-                html += '</div>'
+                    out.write(f'<div class="heading {h["level"]}">{h["text"]}</div>')
+                out.write('</div>')
             
             # Paragraphs
             if page.get('paragraphs'):
-                html += '<div class="section"><div class="section-title">📄 Content Paragraphs</div>'
+                out.write('<div class="section"><div class="section-title">📄 Content Paragraphs</div>')
                 for para in page['paragraphs'][:10]:
-                    html += f'<div class="paragraph">{para}</div>'
-                html += '</div>'
+                    out.write(f'<div class="paragraph">{para}</div>')
+                out.write('</div>')
             
             # Lists
             if page.get('lists'):
-                html += '<div class="section"><div class="section-title">📌 Lists</div>'
+                out.write('<div class="section"><div class="section-title">📌 Lists</div>')
                 for lst in page['lists'][:5]:
-                    html += '<ul class="list">'
+                    out.write('<ul class="list">')
                     for item in lst[:10]:
-                        html += f'<li>{item}</li>'
-                    html += '</ul>'
-                html += '</div>'
+                        out.write(f'<li>{item}</li>')
+                    out.write('</ul>')
+                out.write('</div>')
             
             # Links
             if page.get('links'):
-                html += '<div class="section"><div class="section-title">🔗 Links Found</div><div class="links-grid">'
+                out.write('<div class="section"><div class="section-title">🔗 Links Found</div><div class="links-grid">')
                 for link in page['links'][:20]:
-                    html += f'<div class="link-item"><a href="{link["url"]}" target="_blank">{link["text"]}</a></div>'
-                html += '</div></div>'
+                    out.write(f'<div class="link-item"><a href="{link["url"]}" target="_blank">{link["text"]}</a></div>')
+                out.write('</div></div>')
             
             # Full text
             if page.get('full_text'):
                 text_preview = page['full_text'][:2000]
-                html += f'<div class="section"><div class="section-title">📖 Full Text Content</div><div class="full-text">{text_preview}...</div></div>'
+                out.write(f'<div class="section"><div class="section-title">📖 Full Text Content</div><div class="full-text">{text_preview}...</div></div>')
             
-            html += '</div></div>'
+            out.write('</div></div>')
         
-        html += """
+        out.write("""
     </div>
     
     <script>
-        const pagesData = """ + json.dumps(pages, ensure_ascii=False) + """;
+        const pagesData = """)
+        write_pages_json(out, pages)
+        out.write(""";
         
         function togglePage(num) {
             const content = document.getElementById('page-' + num);
@@ -572,14 +1377,56 @@ class FullWebsiteScraper:
     </script>
 </body>
 </html>
-"""
-        
-        # Save HTML file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html)
-        
-        print(f"💾 HTML output saved: {output_file}")
-        return output_file
+""")
+
+
+def _string_types(tag):
+    """String classes that tag.get_text() includes (None means all)."""
+    types = tag.interesting_string_types
+    if types is None:
+        return (NavigableString, CData)
+    if isinstance(types, type):
+        return (types,)
+    return tuple(types)
+
+
+# Parse-stage workers for scrape_async(parse_workers=N). Each process keeps
+# its own scraper, so only raw bytes go in and the page dict comes out.
+_worker_scraper = None
+
+
+def _init_parse_worker(base_url: str, backend: str = 'bs4', canonicalizer=None):
+    """Create the per-process scraper used for parsing."""
+    global _worker_scraper
+    _worker_scraper = FullWebsiteScraper(base_url, backend=backend, canonicalizer=canonicalizer)
+
+
+def _parse_in_worker(content: bytes, url: str, content_type: str = ''):
+    """Parse and extract one page inside a worker process."""
+    return _worker_scraper.extract_from_content(content, url, content_type)
+
+
+def _parse_batch_in_worker(batch: list) -> list:
+    """Parse and extract (url, content, content_type, date) records inside a worker process."""
+    return [(url, date, _parse_in_worker(content, url, content_type))
+            for url, content, content_type, date in batch]
+
+
+def _replay_in_pool(pool, records, workers: int, batch_size: int):
+    """Yield (url, date, result) for records parsed in pool, in order.
+    
+    At most 2 * workers batches are in flight, so the archive is read
+    no faster than it is parsed.
+    """
+    pending = collections.deque()
+    while True:
+        batch = list(itertools.islice(records, batch_size))
+        if batch:
+            pending.append(pool.submit(_parse_batch_in_worker, batch))
+        if pending and (not batch or len(pending) >= 2 * workers):
+            yield from pending.popleft().result()
+        elif not batch:
+            return
 
 
 def main():
@@ -0,0 +1,65 @@
+"""
+Approximate top-k counting in fixed memory.
+
+HeavyHitters is a Misra-Gries summary, the mergeable form of the
+Space-Saving algorithm: it keeps at most 2 * capacity counters no matter
+how many distinct items it sees. Error bounds, with N the total weight
+counted so far and k the capacity:
+
+  * every reported count is at most the true count and at least
+    true count - N / (k + 1)  (see max_error)
+  * every item whose true count exceeds N / (k + 1) is in the summary
+
+Two summaries built on different parts of a stream can be merged and the
+same bounds hold for the combined stream.
+"""
+
+import heapq
+from operator import itemgetter
+
+
+class HeavyHitters:
+    """Misra-Gries / Space-Saving frequent item summary."""
+
+    def __init__(self, capacity: int = 10000):
+        """Track about capacity items (memory stays O(capacity))."""
+        self.capacity = capacity
+        self.counts = {}
+        self.total = 0
+
+    def update(self, counts: dict):
+        """Add weighted items, e.g. a Counter of one page's words."""
+        return self._add(counts, sum(counts.values()))
+
+    def merge(self, other: 'HeavyHitters'):
+        """Add the counts of another summary to this one."""
+        return self._add(other.counts, other.total)
+
+    def _add(self, counts: dict, total: int):
+        table = self.counts
+        for item, count in counts.items():
+            table[item] = table.get(item, 0) + count
+        self.total += total
+        if len(table) > 2 * self.capacity:
+            self._reduce()
+        return self
+
+    def _reduce(self):
+        """Shrink to capacity counters by subtracting the (capacity+1)-th count."""
+        if len(self.counts) <= self.capacity:
+            return
+        threshold = heapq.nlargest(self.capacity + 1, self.counts.values())[-1]
+        self.counts = {item: count - threshold
+                       for item, count in self.counts.items() if count > threshold}
+
+    @property
+    def max_error(self) -> int:
+        """Largest possible undercount of any reported item."""
+        return self.total // (self.capacity + 1)
+
+    def most_common(self, n: int) -> list:
+        """The n items with the highest estimated counts, as (item, count)."""
+        return heapq.nlargest(n, self.counts.items(), key=itemgetter(1))
+
+    def __len__(self):
+        return len(self.counts)
@@ -0,0 +1,107 @@
+"""
+On-disk HTTP cache for incremental re-crawls.
+
+Each response is stored under a hash of its normalized URL, together with
+its ETag / Last-Modified validators. On the next crawl the request is sent
+with If-None-Match / If-Modified-Since, and a 304 Not Modified is served
+from the cached body instead of downloading the page again.
+"""
+
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+import hashlib
+import json
+import os
+import threading
+
+
+def normalize_cache_url(url: str) -> str:
+    """Cache key form of url: lowercase scheme/host, no fragment."""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(),
+                       parts.path or '/', parts.query, ''))
+
+
+class HTTPCache:
+    """Conditional-GET response cache stored in a directory."""
+
+    def __init__(self, cache_dir: str = '.scraper_cache'):
+        """Initialize cache in cache_dir (created if missing)."""
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+    def _paths(self, url: str):
+        """Metadata and body file paths for url."""
+        key = hashlib.sha256(normalize_cache_url(url).encode('utf-8')).hexdigest()
+        folder = self.cache_dir / key[:2]
+        return folder / f'{key}.json', folder / f'{key}.body'
+
+    def _read_meta(self, url: str):
+        """Cached metadata for url, or None."""
+        meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, url: str) -> dict:
+        """Validator headers to send for url (empty if not cached)."""
+        meta = self._read_meta(url)
+        if not meta:
+            return {}
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def load(self, url: str):
+        """Serve url from cache after a 304.
+
+        Returns (body, content_type) or None if the entry is gone.
+        """
+        meta = self._read_meta(url)
+        _, body_path = self._paths(url)
+        try:
+            body = body_path.read_bytes()
+        except OSError:
+            return None
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(body)
+        return body, (meta or {}).get('content_type', '')
+
+    def store(self, url: str, headers, body: bytes):
+        """Save a full 200 response for url."""
+        with self._lock:
+            self.misses += 1
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return  # Nothing to revalidate with next time
+
+        meta_path, body_path = self._paths(url)
+        meta_path.parent.mkdir(exist_ok=True)
+        meta = {'url': url, 'etag': etag, 'last_modified': last_modified,
+                'content_type': headers.get('Content-Type', ''), 'size': len(body)}
+
+        # Write to temp files first so a crash never leaves half an entry
+        suffix = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+        body_tmp = body_path.with_name(body_path.name + suffix)
+        meta_tmp = meta_path.with_name(meta_path.name + suffix)
+        body_tmp.write_bytes(body)
+        os.replace(body_tmp, body_path)
+        with open(meta_tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(meta_tmp, meta_path)
+
+    def summary(self) -> str:
+        """One-line hit/miss report."""
+        return (f"{self.hits} hits, {self.misses} misses, "
+                f"{self.bytes_saved / 1024:.1f} KB saved")
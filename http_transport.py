@@ -0,0 +1,192 @@
+"""
+HTTP transports: how the scraper talks to the network.
+
+The scraper only uses a small part of an HTTP client, so the client is
+pluggable. A transport provides:
+
+- get(url, headers=None, timeout=15, stream=False, allow_redirects=True),
+  returning a requests-style response (status_code, headers, url,
+  is_redirect, text, raise_for_status(), iter_content(), close())
+- resize(pool_size), user_agent, max_redirects and close()
+
+Two transports come with the scraper:
+
+- RequestsTransport (default): requests.Session over HTTP/1.1. A
+  connection carries one request at a time, so every concurrent fetch
+  needs its own pooled keep-alive connection.
+- HTTPXTransport: httpx client speaking HTTP/2. Concurrent fetches (such
+  as scrape_async's fetch threads) are multiplexed as streams over one
+  connection per host, so there is one TCP (and TLS) handshake per host
+  instead of one per pooled connection. https:// servers negotiate
+  HTTP/2 (falling back to HTTP/1.1); http1=False also speaks HTTP/2 to
+  plain http:// servers (prior knowledge). Needs
+  `pip install httpx[http2]`.
+
+Over HTTP/2, a response closed before its body was read (a download
+content_gate skips) is still read to the end, so the connection keeps
+its flow-control window; over HTTP/1.1 the connection is dropped instead.
+
+retries re-sends GET requests that failed to connect; RequestsTransport
+also retries 500/502/504 answers, with exponential backoff. 429 and 503
+are left to the scraper, which waits out Retry-After through its rate
+limiter instead of sleeping inside a fetch.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+}
+RETRY_STATUSES = (500, 502, 504)
+MAX_REDIRECTS = 30
+
+
+class RequestsTransport:
+    """requests.Session with a tunable keep-alive connection pool."""
+
+    max_redirects = MAX_REDIRECTS
+
+    def __init__(self, pool_size: int = 10, keep_alive: bool = True, retries: int = 0,
+                 backoff: float = 0.5, headers: dict = None):
+        """Keep up to pool_size connections per host open (keep_alive=False: none)."""
+        self.keep_alive = keep_alive
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+        self.pool_size = 0
+        self.resize(pool_size)
+
+    @property
+    def user_agent(self) -> str:
+        return self.session.headers['User-Agent']
+
+    def resize(self, pool_size: int):
+        """Mount adapters big enough for pool_size parallel connections."""
+        max_retries = 0
+        if self.retries:
+            max_retries = Retry(total=self.retries, backoff_factor=self.backoff,
+                                status_forcelist=RETRY_STATUSES, allowed_methods=('GET',),
+                                raise_on_status=False,
+                                # else urllib3 retries any 429/503 carrying Retry-After
+                                respect_retry_after_header=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                              max_retries=max_retries)
+        # Drop the previous adapters' connection pools
+        for old in set(self.session.adapters.values()):
+            old.close()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.pool_size = pool_size
+
+    def get(self, url: str, headers: dict = None, timeout: float = 15, stream: bool = False,
+            allow_redirects: bool = True):
+        return self.session.get(url, headers=headers, timeout=timeout, stream=stream,
+                                allow_redirects=allow_redirects)
+
+    def close(self):
+        self.session.close()
+
+
+class HTTPXResponse:
+    """requests-style view of an httpx response (the parts the scraper uses)."""
+
+    def __init__(self, response):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.http_version = response.http_version
+        self._body = None
+
+    @property
+    def is_redirect(self) -> bool:
+        return self._response.has_redirect_location
+
+    @property
+    def text(self) -> str:
+        self._response.read()
+        return self._response.text
+
+    def raise_for_status(self):
+        # Like requests: only 4xx and 5xx are errors
+        if self.status_code >= 400:
+            self._response.raise_for_status()
+
+    def iter_content(self, chunk_size: int = None):
+        self._body = self._response.iter_bytes(chunk_size)
+        return self._body
+
+    def close(self):
+        if self.http_version == 'HTTP/2' and not self._response.is_closed:
+            # httpx neither resets an HTTP/2 stream closed early nor returns
+            # its flow-control credit, so unread bodies would slowly stall
+            # the whole connection: read them to the end instead
+            try:
+                if self._body is not None:
+                    for _ in self._body:
+                        pass
+                elif not self._response.is_stream_consumed:
+                    for _ in self._response.iter_raw():
+                        pass
+            except Exception:
+                pass  # The connection broke: nothing left to keep open
+        self._response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HTTPXTransport:
+    """httpx client with HTTP/2: concurrent requests share one connection per host."""
+
+    max_redirects = MAX_REDIRECTS
+
+    def __init__(self, http2: bool = True, http1: bool = True, pool_size: int = 10,
+                 keep_alive: bool = True, retries: int = 0, headers: dict = None):
+        """Open up to pool_size connections (HTTP/2 rarely needs more than one per host)."""
+        import httpx  # optional dependency: pip install httpx[http2]
+        self._httpx = httpx
+        self.http2 = http2
+        self.http1 = http1
+        self.keep_alive = keep_alive
+        self.retries = retries
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self.client = None
+        self.pool_size = 0
+        self.resize(pool_size)
+
+    @property
+    def user_agent(self) -> str:
+        return self.headers['User-Agent']
+
+    def resize(self, pool_size: int):
+        """Replace the client with one allowing pool_size connections."""
+        httpx = self._httpx
+        limits = httpx.Limits(max_connections=pool_size,
+                              max_keepalive_connections=pool_size if self.keep_alive else 0)
+        transport = httpx.HTTPTransport(http1=self.http1, http2=self.http2, limits=limits,
+                                        retries=self.retries)
+        if self.client:
+            self.client.close()
+        self.client = httpx.Client(headers=self.headers, transport=transport,
+                                   max_redirects=self.max_redirects)
+        self.pool_size = pool_size
+
+    def get(self, url: str, headers: dict = None, timeout: float = 15, stream: bool = False,
+            allow_redirects: bool = True):
+        request = self.client.build_request('GET', url, headers=headers, timeout=timeout)
+        return HTTPXResponse(self.client.send(request, stream=stream,
+                                              follow_redirects=allow_redirects))
+
+    def close(self):
+        self.client.close()
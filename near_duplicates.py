@@ -0,0 +1,91 @@
+"""
+Near-duplicate page detection with SimHash.
+
+Each page's full_text is reduced to a 64-bit SimHash fingerprint of its
+word shingles; pages whose fingerprints differ in at most max_distance
+bits are near-duplicates (print views, tag pages, the same article under
+several URLs...).
+
+Lookups use LSH banding: the fingerprint is cut into max_distance + 1
+bands and indexed by each band. Two fingerprints within max_distance bits
+must agree on at least one whole band (pigeonhole), so a lookup only
+compares against the pages in a few small buckets instead of every page
+seen so far.
+
+Needs numpy (fingerprints are computed vectorized).
+"""
+
+import hashlib
+import re
+
+import numpy as np
+
+
+WORD_RE = re.compile(r'\w+')
+BITS = 64
+_BIT_POSITIONS = np.arange(BITS, dtype=np.uint64)
+
+
+def _feature_hash(feature: str) -> int:
+    """Stable 64-bit hash (the same in every process and run)."""
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def simhash(text: str, shingle_size: int = 3):
+    """64-bit SimHash of text's word shingles, or None if text has no words."""
+    words = WORD_RE.findall(text.lower())
+    if not words:
+        return None
+    size = min(shingle_size, len(words))
+    shingles = {}
+    for i in range(len(words) - size + 1):
+        shingle = ' '.join(words[i:i + size])
+        shingles[shingle] = shingles.get(shingle, 0) + 1
+
+    hashes = np.fromiter((_feature_hash(s) for s in shingles), dtype=np.uint64, count=len(shingles))
+    weights = np.fromiter(shingles.values(), dtype=np.float64, count=len(shingles))
+    bits = ((hashes[:, None] >> _BIT_POSITIONS) & np.uint64(1)).astype(np.float64)
+    # Each bit of the fingerprint is set when the weighted vote is positive
+    votes = weights @ (2 * bits - 1)
+    return sum(1 << i for i in np.flatnonzero(votes > 0).tolist())
+
+
+class NearDuplicateIndex:
+    """SimHash fingerprints of the pages seen so far, banded for fast lookup."""
+
+    def __init__(self, max_distance: int = 3, shingle_size: int = 3):
+        """Pages within max_distance differing bits (of 64) count as duplicates."""
+        self.max_distance = max_distance
+        self.shingle_size = shingle_size
+        bands = max_distance + 1
+        bounds = [BITS * i // bands for i in range(bands + 1)]
+        self._bands = [(lo, (1 << (hi - lo)) - 1) for lo, hi in zip(bounds, bounds[1:])]
+        self._tables = [{} for _ in self._bands]
+        self.size = 0
+
+    def find(self, fingerprint: int):
+        """URL of an indexed page near fingerprint, or None."""
+        for (shift, mask), table in zip(self._bands, self._tables):
+            for other, url in table.get((fingerprint >> shift) & mask, ()):
+                if bin(fingerprint ^ other).count('1') <= self.max_distance:
+                    return url
+        return None
+
+    def add(self, fingerprint: int, url: str):
+        """Index a page's fingerprint."""
+        for (shift, mask), table in zip(self._bands, self._tables):
+            table.setdefault((fingerprint >> shift) & mask, []).append((fingerprint, url))
+        self.size += 1
+
+    def check(self, url: str, text: str):
+        """URL of an earlier near-duplicate of this page, or None.
+
+        Pages that are not duplicates are added to the index.
+        """
+        fingerprint = simhash(text, self.shingle_size)
+        if fingerprint is None:
+            return None
+        duplicate_of = self.find(fingerprint)
+        if duplicate_of is None:
+            self.add(fingerprint, url)
+        return duplicate_of
@@ -0,0 +1,142 @@
+"""
+Page sinks: receive pages as soon as they are extracted.
+
+Register sinks with FullWebsiteScraper.add_sink() (or pass a plain
+function). Together with retain_pages=False, a crawl of any size runs in
+constant memory: every page goes straight to the sinks and is dropped.
+
+A sink is any object with write(page), flush() and close(). The scraper
+calls flush() whenever it checkpoints (with a state_db: just before each
+commit of the crawl state) and when a crawl ends. It never closes them:
+whoever creates a sink closes it (JSONLSink and QueueSink are context
+managers), so a sink can outlive several crawls.
+"""
+
+import json
+
+
+class JSONLSink:
+    """Append one JSON object per line to a file.
+
+    Lines are held back until flush(), so the file only ever has the
+    pages the crawl state has committed too: after a crash, a resumed
+    crawl (append=True) neither repeats nor misses records.
+    """
+
+    def __init__(self, path: str, append: bool = False):
+        """Open path for writing (append=True keeps existing lines)."""
+        self.path = path
+        self.count = 0
+        self._lines = []
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, page: dict):
+        if self._file.closed:
+            raise ValueError(f"JSONLSink for {self.path} is closed")
+        self._lines.append(json.dumps(page, ensure_ascii=False) + '\n')
+        self.count += 1
+
+    def flush(self):
+        self._file.writelines(self._lines)
+        self._lines = []
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CallbackSink:
+    """Call a function with every page."""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def write(self, page: dict):
+        self.callback(page)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class QueueSink:
+    """Put every page on a queue (queue.Queue, multiprocessing.Queue, ...).
+
+    close() puts `sentinel` (None by default) so consumers know the
+    crawl is over. A bounded queue slows the crawl down to the speed of
+    its consumer.
+    """
+
+    def __init__(self, queue, sentinel=None):
+        self.queue = queue
+        self.sentinel = sentinel
+        self.closed = False
+
+    def write(self, page: dict):
+        if self.closed:
+            raise ValueError("QueueSink is closed")
+        self.queue.put(page)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.queue.put(self.sentinel)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def as_sink(sink):
+    """Wrap plain functions in a CallbackSink."""
+    if hasattr(sink, 'write'):
+        return sink
+    if callable(sink):
+        return CallbackSink(sink)
+    raise TypeError(f"Not a page sink: {sink!r}")
+
+
+def iter_jsonl(path: str):
+    """Yield pages back from a JSONLSink file one at a time."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class JSONLPages:
+    """Re-iterable, len()-able view of a JSONLSink file.
+
+    Lets the report generators stream a crawl from disk without ever
+    loading all pages into memory.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._count = None
+
+    def __iter__(self):
+        return iter_jsonl(self.path)
+
+    def __len__(self):
+        if self._count is None:
+            self._count = sum(1 for _ in self)
+        return self._count
+
+    def __bool__(self):
+        return len(self) > 0
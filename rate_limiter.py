@@ -0,0 +1,131 @@
+"""
+Adaptive per-host rate limiting.
+
+Every host gets a token bucket whose refill rate (requests/sec) is tuned
+AIMD-style, the same way TCP tunes its congestion window:
+
+- a fast, successful response adds `increase` req/s (additive increase)
+- a slow response, an error or a 429/503 multiplies the rate by
+  `backoff` (multiplicative decrease), at most once per observed latency
+- robots.txt Crawl-delay caps the rate at 1 / delay
+- Retry-After on 429/503 pauses the host until it has passed
+
+The crawl therefore speeds up while the origin keeps up and backs off as
+soon as it struggles.
+"""
+
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+import asyncio
+import threading
+import time
+
+
+def parse_retry_after(value) -> float:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return 0.0
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostRateLimiter:
+    """Token bucket per host with AIMD rate control."""
+
+    def __init__(self, rate: float = 1.0, min_rate: float = 0.1, max_rate: float = 20.0,
+                 burst: float = 1.0, increase: float = 0.25, backoff: float = 0.5,
+                 target_latency: float = 2.0):
+        """Initialize limiter. Rates are requests per second per host."""
+        self.initial_rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.backoff = backoff
+        self.target_latency = target_latency
+        self.hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url: str) -> dict:
+        """Bucket state for the host of url (created on first use)."""
+        host = urlparse(url).netloc
+        if host not in self.hosts:
+            self.hosts[host] = {
+                'rate': self.initial_rate,
+                'max_rate': self.max_rate,
+                'tokens': self.burst,
+                'updated': time.monotonic(),
+                'blocked_until': 0.0,
+                'last_backoff': 0.0,
+            }
+        return self.hosts[host]
+
+    def set_crawl_delay(self, url: str, delay: float):
+        """Apply a robots.txt Crawl-delay to the host of url."""
+        if not delay or delay <= 0:
+            return
+        with self._lock:
+            state = self._host(url)
+            state['max_rate'] = min(state['max_rate'], 1.0 / delay)
+            state['rate'] = min(state['rate'], state['max_rate'])
+
+    def reserve(self, url: str) -> float:
+        """Take a token for url and return how long to wait before sending.
+
+        Tokens may go negative, so concurrent callers queue up behind each
+        other instead of all firing when the next token arrives.
+        """
+        with self._lock:
+            state = self._host(url)
+            now = time.monotonic()
+            state['tokens'] = min(self.burst,
+                                  state['tokens'] + (now - state['updated']) * state['rate'])
+            state['updated'] = now
+            state['tokens'] -= 1
+            wait = 0.0 if state['tokens'] >= 0 else -state['tokens'] / state['rate']
+            return max(wait, state['blocked_until'] - now)
+
+    def wait(self, url: str):
+        """Block until a request to url is allowed."""
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, url: str):
+        """Async version of wait()."""
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record(self, url: str, latency: float, status: int = None, retry_after=None):
+        """Feed back one response (status None means the request failed)."""
+        with self._lock:
+            state = self._host(url)
+            now = time.monotonic()
+            throttled = status in (429, 503)
+            if throttled:
+                pause = parse_retry_after(retry_after)
+                if pause:
+                    state['blocked_until'] = max(state['blocked_until'], now + pause)
+
+            if status is None or throttled or status >= 500 or latency > self.target_latency:
+                # One backoff per round trip, not one per in-flight request
+                if now - state['last_backoff'] >= latency:
+                    state['rate'] = max(self.min_rate, state['rate'] * self.backoff)
+                    state['last_backoff'] = now
+            elif status < 400:
+                state['rate'] = min(state['max_rate'], state['rate'] + self.increase)
+
+    def rate(self, url: str) -> float:
+        """Current allowed rate for the host of url."""
+        with self._lock:
+            return self._host(url)['rate']
@@ -0,0 +1,184 @@
+"""
+Sharded and compressed page data for HTML reports.
+
+Instead of inlining every page, generate_html(..., shard_dir=...) writes a
+small shell HTML plus data shards of shard_size pages each. A shard is a
+gzip-compressed JSON array, base64-encoded inside a tiny .js file so the
+report still works when opened straight from disk (file:// pages may load
+scripts but not fetch() files). The shell only loads the shards a reader
+actually opens.
+
+Shards are content-addressed: the file name is a hash of the shard's
+JSON without the per-crawl fields (VOLATILE_FIELDS, e.g. scraped_at), so
+re-generating a report, even after a re-crawl, skips every shard whose
+pages did not change and the browser can cache them forever. A skipped
+shard keeps the scraped_at of the crawl that first wrote it. shard_dir keeps a
+manifest of the shards it owns (shards.json); only those are ever deleted.
+
+write_gzip_base64() is the single-file variant used by
+generate_html(..., compress=True): the whole page array as one
+gzip + base64 string literal inside the report.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import base64
+import gzip
+import hashlib
+import json
+import os
+import re
+import zlib
+
+
+MANIFEST_NAME = 'shards.json'
+SHARD_NAME_RE = re.compile(r'^[0-9a-f]{20}\.js$')
+# Page fields that change on every crawl, left out of shard names
+VOLATILE_FIELDS = ('scraped_at',)
+
+
+def write_gzip_base64(out, pages):
+    """Write pages as a quoted base64 string of the gzipped JSON array.
+
+    Pages are compressed and encoded as they stream past, so the whole
+    array is never held in memory.
+    """
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    pending = b''
+
+    def emit(data: bytes, final: bool = False):
+        nonlocal pending
+        pending += data
+        cut = len(pending) if final else len(pending) - len(pending) % 3
+        out.write(base64.b64encode(pending[:cut]).decode('ascii'))
+        pending = pending[cut:]
+
+    out.write('"')
+    emit(compressor.compress(b'['))
+    for idx, page in enumerate(pages):
+        text = (', ' if idx else '') + json.dumps(page, ensure_ascii=False)
+        emit(compressor.compress(text.encode('utf-8')))
+    emit(compressor.compress(b']') + compressor.flush(), final=True)
+    out.write('"')
+
+
+def _chunks(pages, size: int):
+    """Yield lists of up to size pages."""
+    chunk = []
+    for page in pages:
+        chunk.append(page)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _write_shard(shard_dir: Path, chunk: list):
+    """Write one shard unless it already exists; return (name, written)."""
+    stable = [{key: value for key, value in page.items() if key not in VOLATILE_FIELDS}
+              for page in chunk]
+    name = hashlib.sha256(json.dumps(stable, ensure_ascii=False).encode('utf-8')).hexdigest()[:20]
+    path = shard_dir / f'{name}.js'
+    if path.exists():
+        return name, False
+
+    data = json.dumps(chunk, ensure_ascii=False).encode('utf-8')
+    payload = base64.b64encode(gzip.compress(data, mtime=0)).decode('ascii')
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    tmp.write_text(f'reportShard("{name}", "{payload}");\n', encoding='ascii')
+    os.replace(tmp, path)
+    return name, True
+
+
+def _owned_shards(shard_dir: Path) -> set:
+    """File names of the shards listed in shard_dir's manifest (none without one)."""
+    try:
+        return set(json.loads((shard_dir / MANIFEST_NAME).read_text(encoding='utf-8'))['shards'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return set()  # No readable manifest: delete nothing
+
+
+def write_shards(pages, shard_dir: str, shard_size: int = 100, workers: int = 4) -> dict:
+    """Write pages as shards into shard_dir, compressing them in parallel.
+
+    Returns {'shards': [names in page order], 'written': n, 'skipped': n}.
+    Shards an earlier run wrote (listed in shard_dir's manifest) that are
+    no longer used are removed, so use one shard_dir per report. Other
+    files in shard_dir are never touched.
+    """
+    shard_dir = Path(shard_dir)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    names, written = [], 0
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in _chunks(pages, shard_size):
+            pending.append(pool.submit(_write_shard, shard_dir, chunk))
+            # Bound the number of chunks held in memory
+            while len(pending) > workers * 2:
+                name, was_written = pending.popleft().result()
+                names.append(name)
+                written += was_written
+        for future in pending:
+            name, was_written = future.result()
+            names.append(name)
+            written += was_written
+
+    keep = {f'{name}.js' for name in names}
+    for file_name in _owned_shards(shard_dir) - keep:
+        if SHARD_NAME_RE.match(file_name):
+            (shard_dir / file_name).unlink(missing_ok=True)
+    manifest = shard_dir / MANIFEST_NAME
+    tmp = manifest.with_name(f'{manifest.name}.{os.getpid()}.tmp')
+    tmp.write_text(json.dumps({'shards': sorted(keep)}), encoding='utf-8')
+    os.replace(tmp, manifest)
+
+    return {'shards': names, 'written': written, 'skipped': len(names) - written}
+
+
+# Browser side of gzip + base64 payloads.
+GZIP_JSON_JS = """
+        async function decodeGzipJson(payload) {
+            const binary = atob(payload);
+            const bytes = new Uint8Array(binary.length);
+            for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+            return JSON.parse(await new Response(stream).text());
+        }
+"""
+
+# Page access for sharded reports; needs shardFiles, SHARD_DIR, SHARD_SIZE.
+SHARD_PAGES_JS = GZIP_JSON_JS + """
+        const shardPromises = new Map();
+        const shardWaiters = {};
+
+        // Called by every shard file once it has loaded
+        function reportShard(name, payload) {
+            (shardWaiters[name] || []).forEach(resolve => resolve(payload));
+            delete shardWaiters[name];
+        }
+
+        function loadShard(k) {
+            if (!shardPromises.has(k)) {
+                const name = shardFiles[k];
+                shardPromises.set(k, new Promise((resolve, reject) => {
+                    (shardWaiters[name] = shardWaiters[name] || []).push(resolve);
+                    const script = document.createElement('script');
+                    script.src = SHARD_DIR + '/' + name + '.js';
+                    script.onerror = () => reject(new Error('Could not load ' + script.src));
+                    document.head.appendChild(script);
+                }).then(decodeGzipJson));
+            }
+            return shardPromises.get(k);
+        }
+
+        function getPage(i) {
+            return loadShard(Math.floor(i / SHARD_SIZE)).then(pages => pages[i % SHARD_SIZE]);
+        }
+
+        function allPages() {
+            return Promise.all(shardFiles.map((_, k) => loadShard(k))).then(chunks => chunks.flat());
+        }
+"""
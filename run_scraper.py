@@ -8,11 +8,84 @@ from full_website_scraper import FullWebsiteScraper
 from content_analyzer import ContentAnalyzer
 from markdown_exporter import MarkdownExporter
 from simple_html_generator import generate_html
+from page_sinks import JSONLSink
+from url_canonicalizer import URLCanonicalizer
+from content_gate import ContentGate
+from http_transport import HTTPXTransport, RequestsTransport
+import argparse
 import webbrowser
 from pathlib import Path
 
 
+def parse_args():
+    """Parse optional command line settings."""
+    parser = argparse.ArgumentParser(description="Website Scraper Pro")
+    parser.add_argument('--priority', choices=['fifo', 'bfs', 'shallow_path', 'sitemap'],
+                        default='bfs', help="crawl order (default: bfs)")
+    parser.add_argument('--cache-dir', default=None,
+                        help="HTTP cache folder for fast re-crawls (default: off)")
+    parser.add_argument('--state-db', default=None,
+                        help="SQLite file that saves crawl progress (default: off)")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue the crawl saved in --state-db")
+    parser.add_argument('--backend', choices=['bs4', 'lxml'], default='bs4',
+                        help="extraction backend: bs4 (lenient) or lxml (faster)")
+    parser.add_argument('--warc-dir', default=None,
+                        help="archive every downloaded page in .warc.gz files in this folder")
+    parser.add_argument('--replay-warc', default=None,
+                        help="re-extract pages from this WARC folder/file instead of crawling")
+    parser.add_argument('--jsonl', default=None,
+                        help="also stream every page to this JSON Lines file")
+    parser.add_argument('--engine', choices=['serial', 'async'], default='serial',
+                        help="crawl engine (default: serial)")
+    parser.add_argument('--concurrency', type=int, default=10,
+                        help="async engine: max requests in flight (default: 10)")
+    parser.add_argument('--per-host', type=int, default=4,
+                        help="async engine: max requests per host (default: 4)")
+    parser.add_argument('--http2', action='store_true',
+                        help="use HTTP/2 (one multiplexed connection per host, needs httpx[http2])")
+    parser.add_argument('--pool-size', type=int, default=10,
+                        help="connections kept open per host (default: 10)")
+    parser.add_argument('--no-keep-alive', action='store_true',
+                        help="open a new connection for every request")
+    parser.add_argument('--retries', type=int, default=0,
+                        help="retry failed requests this many times (default: 0)")
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help="async engine / replay: parse in N worker processes (default: 0)")
+    parser.add_argument('--analyze-workers', type=int, default=0,
+                        help="analyze content in N worker processes (default: 0)")
+    parser.add_argument('--phrases', action='store_true',
+                        help="also find the top 2- and 3-word phrases")
+    parser.add_argument('--approximate-stats', action='store_true',
+                        help="count keywords/phrases in fixed memory (approximate)")
+    parser.add_argument('--tfidf', action='store_true',
+                        help="find distinctive terms with TF-IDF (needs numpy)")
+    parser.add_argument('--sitemaps', action='store_true',
+                        help="seed the crawl with the pages listed in the site's sitemaps")
+    parser.add_argument('--max-body-mb', type=float, default=10,
+                        help="skip pages bigger than this many MB (default: 10)")
+    parser.add_argument('--keep-params', default='',
+                        help="comma-separated query parameters that select different pages, "
+                             "or 'all' (default: queries are ignored)")
+    parser.add_argument('--strip-trailing-slash', action='store_true',
+                        help="treat /docs/ and /docs as the same URL without asking the server")
+    parser.add_argument('--near-duplicates', choices=['mark', 'drop'], default=None,
+                        help="mark or drop pages nearly identical to an earlier page (needs numpy)")
+    parser.add_argument('--skip-duplicate-links', action='store_true',
+                        help="do not follow links found on near-duplicate pages")
+    parser.add_argument('--lazy-report', action='store_true',
+                        help="HTML report renders pages on demand (for big crawls)")
+    parser.add_argument('--shard-dir', default=None,
+                        help="put report page data in compressed shards in this folder "
+                             "(one folder per report: its unused old shards are deleted)")
+    parser.add_argument('--compress-report', action='store_true',
+                        help="embed report page data gzip-compressed")
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    
     print("="*60)
     print("🚀 WEBSITE SCRAPER PRO")
     print("="*60)
@@ -35,8 +108,34 @@ def main():
     print(f"\n🚀 Starting scraper...\n")
     
     print("📥 Step 1/4: Scraping website...")
-    scraper = FullWebsiteScraper(url, max_pages=max_pages)
-    pages = scraper.scrape()
+    keep_params = (None if args.keep_params == 'all'
+                   else [name for name in args.keep_params.split(',') if name])
+    canonicalizer = URLCanonicalizer(url, keep_params=keep_params,
+                                     trailing_slash='strip' if args.strip_trailing_slash else 'keep')
+    transport_class = HTTPXTransport if args.http2 else RequestsTransport
+    transport = transport_class(pool_size=args.pool_size, keep_alive=not args.no_keep_alive,
+                                retries=args.retries)
+    scraper = FullWebsiteScraper(url, max_pages=max_pages, priority=args.priority,
+                                 cache_dir=args.cache_dir, state_db=args.state_db,
+                                 backend=args.backend, near_duplicates=args.near_duplicates,
+                                 follow_duplicate_links=not args.skip_duplicate_links,
+                                 canonicalizer=canonicalizer, sitemaps=args.sitemaps,
+                                 content_gate=ContentGate(int(args.max_body_mb * 1024 * 1024)),
+                                 transport=transport, warc_dir=args.warc_dir)
+    jsonl = scraper.add_sink(JSONLSink(args.jsonl, append=args.resume)) if args.jsonl else None
+    try:
+        if args.replay_warc:
+            pages = scraper.replay_warc(args.replay_warc, workers=args.parse_workers)
+        elif args.engine == 'async':
+            pages = scraper.scrape_async(concurrency=args.concurrency,
+                                         per_host_concurrency=args.per_host,
+                                         parse_workers=args.parse_workers,
+                                         resume=args.resume)
+        else:
+            pages = scraper.scrape(resume=args.resume)
+    finally:
+        if jsonl:
+            jsonl.close()
     
     if not pages:
         print("\n❌ No pages scraped")
@@ -44,7 +143,18 @@ def main():
     
     print("\n📊 Step 2/4: Analyzing content...")
     analyzer = ContentAnalyzer()
-    stats = analyzer.analyze_pages(pages)
+    options = {'approximate': args.approximate_stats,
+               'ngrams': (2, 3) if args.phrases else ()}
+    if args.analyze_workers:
+        stats = analyzer.analyze_pages_parallel(pages, workers=args.analyze_workers, **options)
+    else:
+        stats = analyzer.analyze_pages(pages, **options)
+    if args.tfidf:
+        from tfidf import TfidfAnalyzer
+        tfidf = TfidfAnalyzer.analyze_pages(pages)
+        stats['top_terms'] = tfidf['site']
+        for page in pages:
+            page['top_terms'] = tfidf['pages'].get(page['url'], [])
     
     print(f"  ✅ Total words: {stats['total_words']:,}")
     print(f"  ✅ Reading time: {stats['reading_time_minutes']} minutes")
@@ -60,7 +170,9 @@ def main():
     
     print("\n🌐 Step 4/4: Generating interactive HTML...")
     try:
-        html_file = generate_html(pages, scraper.domain, stats, url)
+        html_file = generate_html(pages, scraper.domain, stats, url,
+                                  lazy=args.lazy_report, shard_dir=args.shard_dir,
+                                  compress=args.compress_report)
         print(f"  ✅ HTML: {html_file}")
         
         print(f"\n🌐 Opening in browser...")
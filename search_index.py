@@ -0,0 +1,111 @@
+"""
+Inverted search index for the HTML reports.
+
+Built once in Python when the report is generated and embedded as JSON,
+so the search box only has to look terms up instead of rescanning every
+page's text on each keystroke.
+
+build_search_index() returns {'terms': sorted terms, 'postings':
+{term: array('I')}}; write_search_index() serializes it in this compact
+JSON form (page numbers are 0-based positions in pagesData):
+
+    {"terms": ["apple", "apply", ...],           # sorted
+     "postings": [[gap, count, gap, count, ...], ...]}
+
+postings[i] belongs to terms[i]; each gap is the difference to the
+previous page number, each count the occurrences in that page's title
+and full_text. The arrays in memory hold the same gap/count pairs. Terms
+are sorted so prefix lookups are a binary search.
+"""
+
+from array import array
+from collections import Counter
+import json
+import re
+
+
+TOKEN_RE = re.compile(r'\w+')
+# Same tokens in the browser; keep the two in sync
+TOKEN_RE_JS = r'/[\p{L}\p{N}_]+/gu'
+MAX_TERM_LENGTH = 40
+
+
+def build_search_index(pages) -> dict:
+    """Index the title and full_text of every page (one pass over pages).
+
+    Postings are gap-encoded as pages come in, into one array('I') per
+    term (8 bytes per term and page), so the index stays compact and is
+    never copied. Returns {'terms': sorted terms, 'postings': {term: array}}.
+    """
+    postings = {}
+    last_page = {}
+    for page_num, page in enumerate(pages):
+        text = f"{page.get('title') or ''} {page.get('full_text') or ''}"
+        for term, count in Counter(TOKEN_RE.findall(text.lower())).items():
+            if len(term) > MAX_TERM_LENGTH:
+                continue
+            flat = postings.get(term)
+            if flat is None:
+                flat = postings[term] = array('I')
+            flat.append(page_num - last_page.get(term, 0))
+            flat.append(count)
+            last_page[term] = page_num
+    return {'terms': sorted(postings), 'postings': postings}
+
+
+def write_search_index(out, index: dict):
+    """Write index as compact JSON, one postings list at a time."""
+    out.write('{"terms":')
+    out.write(json.dumps(index['terms'], ensure_ascii=False, separators=(',', ':')))
+    out.write(',"postings":[')
+    for i, term in enumerate(index['terms']):
+        if i:
+            out.write(',')
+        out.write('[' + ','.join(map(str, index['postings'][term])) + ']')
+    out.write(']}')
+
+
+# Lookup side of the index, embedded into the report's <script>.
+SEARCH_JS = """
+        const TOKEN_RE = """ + TOKEN_RE_JS + """;
+
+        function tokenize(text) {
+            return text.toLowerCase().match(TOKEN_RE) || [];
+        }
+
+        // Pages containing a term starting with prefix -> total occurrences
+        function lookupPrefix(prefix) {
+            const terms = searchIndex.terms;
+            let lo = 0, hi = terms.length;
+            while (lo < hi) {
+                const mid = (lo + hi) >> 1;
+                if (terms[mid] < prefix) lo = mid + 1; else hi = mid;
+            }
+            const hits = new Map();
+            for (let i = lo; i < terms.length && terms[i].startsWith(prefix); i++) {
+                const flat = searchIndex.postings[i];
+                let pageNum = 0;
+                for (let j = 0; j < flat.length; j += 2) {
+                    pageNum += flat[j];
+                    hits.set(pageNum, (hits.get(pageNum) || 0) + flat[j + 1]);
+                }
+            }
+            return hits;
+        }
+
+        // Pages matching every query token -> summed occurrences
+        function searchIndexLookup(query) {
+            const tokens = tokenize(query);
+            if (!tokens.length) return new Map();
+            let result = lookupPrefix(tokens[0]);
+            for (let t = 1; t < tokens.length && result.size; t++) {
+                const hits = lookupPrefix(tokens[t]);
+                const next = new Map();
+                result.forEach((count, pageNum) => {
+                    if (hits.has(pageNum)) next.set(pageNum, count + hits.get(pageNum));
+                });
+                result = next;
+            }
+            return result;
+        }
+"""
@@ -3,12 +3,227 @@
 from datetime import datetime
 import json
 
+from search_index import build_search_index, write_search_index, SEARCH_JS
+from report_shards import write_shards, write_gzip_base64, GZIP_JSON_JS, SHARD_PAGES_JS
+from pathlib import Path
+import os
+
+
+def write_pages_json(out, pages):
+    """Write pages as a JSON array, one page at a time.
+    
+    Produces the same text as json.dumps(pages, ensure_ascii=False)
+    without ever holding the whole array in memory.
+    """
+    out.write('[')
+    for idx, page in enumerate(pages):
+        if idx:
+            out.write(', ')
+        out.write(json.dumps(page, ensure_ascii=False))
+    out.write(']')
+
+
+def write_page_index(out, pages):
+    """Write the lightweight per-page index used by lazy reports."""
+    out.write('[')
+    for idx, page in enumerate(pages):
+        if idx:
+            out.write(', ')
+        out.write(json.dumps({
+            'title': page.get('title', 'Untitled'),
+            'url': page['url'],
+            'words': len((page.get('full_text') or '').split()),
+            'bytes': len(json.dumps(page, ensure_ascii=False).encode('utf-8')),
+        }, ensure_ascii=False).replace('</', '<\\/'))
+    out.write(']')
+
+
+def write_page_blobs(out, pages):
+    """Write every page as a JSON string, parsed only when it is needed."""
+    out.write('[')
+    for idx, page in enumerate(pages):
+        if idx:
+            out.write(',\n')
+        blob = json.dumps(json.dumps(page, ensure_ascii=False), ensure_ascii=False)
+        out.write(blob.replace('</', '<\\/'))
+    out.write(']')
+
 
 def generate_html(pages: list, domain: str, stats: dict, base_url: str, 
-                 output_file: str = "scraped_website.html") -> str:
-    """Generate clean HTML with search and export."""
+                 output_file: str = "scraped_website.html", lazy: bool = False,
+                 shard_dir: str = None, shard_size: int = 100,
+                 compress: bool = False) -> str:
+    """Generate clean HTML with search and export.
+    
+    The report is written to output_file piece by piece, so memory use
+    does not grow with the size of the report, except for the search
+    index (about 8 bytes per distinct word per page, see search_index.py).
+    
+    With lazy=True only a small index (title, URL, sizes) is loaded up
+    front; page cards are rendered as they scroll into view and a page's
+    content is only parsed when its card is expanded. Use it for reports
+    with thousands of pages.
+    
+    With shard_dir set the report is lazy and the page content goes into
+    compressed shards of shard_size pages in shard_dir (see
+    report_shards.py) instead of the HTML file itself.
     
-    html = f"""
+    With compress=True the page data is embedded gzip-compressed and
+    base64-encoded, and decompressed in the browser when first needed.
+    """
+    shards = None
+    if shard_dir:
+        manifest = write_shards(pages, shard_dir, shard_size)
+        print(f"  📦 Shards: {manifest['written']} written, {manifest['skipped']} unchanged")
+        output_dir = Path(output_file).absolute().parent
+        shards = {
+            'dir': Path(os.path.relpath(Path(shard_dir).absolute(), output_dir)).as_posix(),
+            'files': manifest['shards'],
+            'size': shard_size,
+        }
+    
+    with open(output_file, 'w', encoding='utf-8', buffering=1 << 16) as out:
+        _write_html(out, pages, domain, stats, base_url, lazy, shards, compress)
+    
+    return output_file
+
+
+# Page list for full reports: every card is already in the HTML.
+STATIC_LIST_JS = """
+        function renderUntil(num) {}
+        function ensurePageBody(num) { return Promise.resolve(); }
+"""
+
+# Page access for full reports: everything is in pagesData already.
+FULL_PAGES_JS = """
+        const pageIndex = pagesData;
+        function allPages() { return pagesData; }""" + STATIC_LIST_JS
+
+# Page access for compressed reports: pagesBlob is decompressed once, in
+# the background, the first time page data is needed.
+COMPRESSED_PAGES_JS = GZIP_JSON_JS + """
+        let pagesReady = null;
+        
+        function allPages() {
+            if (!pagesReady) pagesReady = decodeGzipJson(pagesBlob);
+            return pagesReady;
+        }
+        
+        function getPage(i) {
+            return allPages().then(pages => pages[i]);
+        }
+"""
+
+# Page list for lazy and sharded reports: cards are rendered in chunks as
+# the end of the list scrolls into view, and a card's body is built from
+# getPage() the first time the card is expanded.
+PAGE_LIST_JS = """
+        const PAGE_CHUNK = 100;
+        let renderedPages = 0;
+        
+        function escapeHtml(text) {
+            return String(text).replace(/[&<>"']/g, c => ({
+                '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+            })[c]);
+        }
+        
+        function renderChunk() {
+            const end = Math.min(renderedPages + PAGE_CHUNK, pageIndex.length);
+            if (end === renderedPages) return;
+            const cards = [];
+            for (let i = renderedPages; i < end; i++) {
+                const idx = i + 1;
+                cards.push(`
+        <div class="page-card" data-page-id="${idx}">
+            <div class="page-header" onclick="togglePage(${idx})">
+                <div>
+                    <span class="page-number">Page ${idx}</span>
+                    <strong style="margin-left: 1rem;">${escapeHtml(pageIndex[i].title)}</strong>
+                </div>
+                <span id="arrow-${idx}">▼</span>
+            </div>
+            <div class="page-content" id="page-${idx}"></div>
+        </div>`);
+            }
+            const chunk = document.createElement('div');
+            chunk.className = 'page-chunk';
+            chunk.innerHTML = cards.join('');
+            document.getElementById('pageList').appendChild(chunk);
+            renderedPages = end;
+        }
+        
+        function renderUntil(num) {
+            while (renderedPages < num && renderedPages < pageIndex.length) renderChunk();
+        }
+        
+        function pageBodyHtml(page) {
+            let body = `
+                <div class="section">
+                    <div class="section-title">🔗 URL</div>
+                    <a href="${escapeHtml(page.url)}" target="_blank">${escapeHtml(page.url)}</a>
+                </div>`;
+            if (page.main_heading) {
+                body += `
+                <div class="section">
+                    <div class="section-title">📝 Main Heading</div>
+                    <h2>${escapeHtml(page.main_heading)}</h2>
+                </div>`;
+            }
+            if (page.paragraphs && page.paragraphs.length) {
+                body += '<div class="section"><div class="section-title">📄 Content</div>';
+                page.paragraphs.slice(0, 10).forEach(para => {
+                    body += `<p style="margin-bottom: 1rem;">${escapeHtml(para)}</p>`;
+                });
+                body += '</div>';
+            }
+            return body;
+        }
+        
+        function ensurePageBody(num) {
+            const content = document.getElementById('page-' + num);
+            if (!content.dataset.loaded) {
+                content.dataset.loaded = '1';
+                content.loading = Promise.resolve(getPage(num - 1)).then(page => {
+                    content.innerHTML = pageBodyHtml(page);
+                });
+            }
+            return content.loading;
+        }
+        
+        function fillViewport() {
+            const end = document.getElementById('pageListEnd');
+            while (renderedPages < pageIndex.length &&
+                   end.getBoundingClientRect().top < window.innerHeight + 2000) {
+                renderChunk();
+            }
+        }
+        
+        new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) fillViewport();
+        }, { rootMargin: '2000px' }).observe(document.getElementById('pageListEnd'));
+"""
+
+
+# Page access for lazy reports: each page is a JSON string in pageBlobs,
+# parsed the first time it is needed.
+BLOB_PAGES_JS = """
+        const parsedPages = new Map();
+        
+        function getPage(i) {
+            if (!parsedPages.has(i)) parsedPages.set(i, JSON.parse(pageBlobs[i]));
+            return parsedPages.get(i);
+        }
+        
+        function allPages() {
+            return pageIndex.map((_, i) => getPage(i));
+        }
+"""
+
+def _write_html(out, pages, domain: str, stats: dict, base_url: str, lazy: bool = False,
+                shards: dict = None, compress: bool = False):
+    """Stream the report for generate_html into the open file out."""
+    
+    out.write(f"""
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -185,6 +400,11 @@ def generate_html(pages: list, domain: str, stats: dict, base_url: str,
         
         .page-content.active {{ display: block; }}
         
+        .page-chunk {{
+            content-visibility: auto;
+            contain-intrinsic-size: auto 10000px;
+        }}
+        
         .section {{ margin-bottom: 2rem; }}
         
         .section-title {{
@@ -238,7 +458,7 @@ def generate_html(pages: list, domain: str, stats: dict, base_url: str,
     
     <div class="search-bar">
         <input type="text" class="search-input" id="searchInput" 
-               placeholder="🔍 Search content..." onkeyup="searchContent()">
+               placeholder="🔍 Search content..." oninput="scheduleSearch()">
         <div class="search-results" id="searchResults"></div>
     </div>
     
@@ -272,24 +492,55 @@ def generate_html(pages: list, domain: str, stats: dict, base_url: str,
             
             <h3 style="margin-top: 2rem; color: #667eea;">🔑 Top Keywords</h3>
             <div class="keywords-grid">
-"""
+""")
     
     # Add keywords
     for keyword, count in stats['top_keywords'][:15]:
-        html += f'<div class="keyword-tag"><strong>{keyword}</strong> ({count})</div>'
+        out.write(f'<div class="keyword-tag"><strong>{keyword}</strong> ({count})</div>')
     
-    html += """
+    # Add distinctive (TF-IDF) terms
+    if stats.get('top_terms'):
+        out.write("""
+            </div>
+            
+            <h3 style="margin-top: 2rem; color: #667eea;">🎯 Distinctive Terms (TF-IDF)</h3>
+            <div class="keywords-grid">
+""")
+        for term, score in stats['top_terms'][:15]:
+            out.write(f'<div class="keyword-tag"><strong>{term}</strong> ({score:.2f})</div>')
+    
+    # Add phrases
+    if stats.get('top_phrases'):
+        out.write("""
+            </div>
+            
+            <h3 style="margin-top: 2rem; color: #667eea;">💬 Top Phrases</h3>
+            <div class="keywords-grid">
+""")
+        for phrase, count in stats['top_phrases'][:15]:
+            out.write(f'<div class="keyword-tag"><strong>{phrase}</strong> ({count})</div>')
+    
+    out.write("""
             </div>
         </div>
         
         <div style="text-align: center; margin: 2rem 0;">
             <button class="btn" onclick="toggleAll()">Expand/Collapse All</button>
         </div>
-"""
+""")
     
     # Add pages
-    for idx, page in enumerate(pages, 1):
-        html += f"""
+    if lazy or shards:
+        out.write("""
+        <div id="pageList"></div>
+        <div id="pageListEnd" style="height: 1px;"></div>
+""")
+        pages_to_render = ()
+    else:
+        pages_to_render = pages
+    
+    for idx, page in enumerate(pages_to_render, 1):
+        out.write(f"""
         <div class="page-card" data-page-id="{idx}">
             <div class="page-header" onclick="togglePage({idx})">
                 <div>
@@ -303,25 +554,25 @@ def generate_html(pages: list, domain: str, stats: dict, base_url: str,
                     <div class="section-title">🔗 URL</div>
                     <a href="{page['url']}" target="_blank">{page['url']}</a>
                 </div>
-"""
+""")
         
         if page.get('main_heading'):
-            html += f"""
+            out.write(f"""
                 <div class="section">
                     <div class="section-title">📝 Main Heading</div>
                     <h2>{page['main_heading']}</h2>
                 </div>
-"""
+""")
         
         if page.get('paragraphs'):
-            html += '<div class="section"><div class="section-title">📄 Content</div>'
+            out.write('<div class="section"><div class="section-title">📄 Content</div>')
             for para in page['paragraphs'][:10]:
-                html += f'<p style="margin-bottom: 1rem;">{para}</p>'
-            html += '</div>'
+                out.write(f'<p style="margin-bottom: 1rem;">{para}</p>')
+            out.write('</div>')
         
-        html += '</div></div>'
+        out.write('</div></div>')
     
-    html += """
+    out.write("""
     </div>
     
     <footer style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
@@ -356,10 +607,45 @@ def generate_html(pages: list, domain: str, stats: dict, base_url: str,
     </footer>
     
     <script>
-        const pagesData = """ + json.dumps(pages, ensure_ascii=False) + """;
+        """)
+    if shards:
+        out.write('const pageIndex = ')
+        write_page_index(out, pages)
+        out.write(f""";
+        const shardFiles = {json.dumps(shards['files'])};
+        const SHARD_DIR = {json.dumps(shards['dir'])};
+        const SHARD_SIZE = {shards['size']};""" + PAGE_LIST_JS + SHARD_PAGES_JS)
+    elif compress:
+        out.write('const pageIndex = ')
+        write_page_index(out, pages)
+        out.write(';\n        const pagesBlob = ')
+        write_gzip_base64(out, pages)
+        out.write(';' + (PAGE_LIST_JS if lazy else STATIC_LIST_JS) + COMPRESSED_PAGES_JS)
+    elif lazy:
+        out.write('const pageIndex = ')
+        write_page_index(out, pages)
+        out.write(';\n        const pageBlobs = ')
+        write_page_blobs(out, pages)
+        out.write(';' + PAGE_LIST_JS + BLOB_PAGES_JS)
+    else:
+        out.write('const pagesData = ')
+        write_pages_json(out, pages)
+        out.write(';' + FULL_PAGES_JS)
+    out.write("""
+        const searchIndex = """)
+    write_search_index(out, build_search_index(pages))
+    out.write(""";
         let currentSearchQuery = '';
+        let searchTimer = null;
+        const MAX_SEARCH_RESULTS = 200;
+""" + SEARCH_JS + """
+        function scheduleSearch() {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(searchContent, 200);
+        }
         
         function togglePage(num) {
+            ensurePageBody(num);
             const content = document.getElementById('page-' + num);
             const arrow = document.getElementById('arrow-' + num);
             if (content.classList.contains('active')) {
@@ -378,6 +664,7 @@ def generate_html(pages: list, domain: str, stats: dict, base_url: str,
                 if (allExpanded) {
                     content.classList.remove('active');
                 } else {
+                    ensurePageBody(Number(content.id.slice(5)));
                     content.classList.add('active');
                 }
             });
@@ -468,51 +755,38 @@ def generate_html(pages: list, domain: str, stats: dict, base_url: str,
             
             currentSearchQuery = query;
             results.style.display = 'block';
-            results.innerHTML = '<h3>Searching...</h3>';
             
-            let found = 0;
-            const matchingPages = [];
-            
-            pagesData.forEach((page, idx) => {
-                const title = (page.title || '').toLowerCase();
-                const text = (page.full_text || '').toLowerCase();
-                const queryLower = query.toLowerCase();
-                
-                if (title.includes(queryLower) || text.includes(queryLower)) {
-                    found++;
-                    const occurrences = (text.match(new RegExp(queryLower, 'g')) || []).length;
-                    matchingPages.push({
-                        idx: idx + 1,
-                        title: page.title,
-                        occurrences: occurrences
-                    });
-                }
-            });
+            const hits = searchIndexLookup(query);
+            const found = hits.size;
             
             if (found === 0) {
                 results.innerHTML = '<h3>No results found</h3><p>Try different keywords</p>';
             } else {
-                results.innerHTML = `<h3>Found ${found} pages with "${query}"</h3>`;
-                matchingPages.forEach(match => {
-                    results.innerHTML += `
+                const pageNums = Array.from(hits.keys()).sort((a, b) => a - b);
+                const rows = pageNums.slice(0, MAX_SEARCH_RESULTS).map(pageNum => `
                         <div style="padding: 1rem; border-bottom: 1px solid #eee; display: flex; justify-content: space-between; align-items: center;">
                             <div>
-                                <strong>Page ${match.idx}:</strong> ${match.title}
-                                <br><small style="color: #666;">${match.occurrences} occurrence(s)</small>
+                                <strong>Page ${pageNum + 1}:</strong> ${pageIndex[pageNum].title}
+                                <br><small style="color: #666;">${hits.get(pageNum)} occurrence(s)</small>
                             </div>
-                            <button onclick="scrollToPageAndHighlight(${match.idx})" 
+                            <button onclick="scrollToPageAndHighlight(${pageNum + 1})" 
                                     style="padding: 0.5rem 1rem; 
                                            background: #667eea; color: white; border: none; 
                                            border-radius: 5px; cursor: pointer; white-space: nowrap;">
                                 View & Highlight
                             </button>
                         </div>
-                    `;
-                });
+                    `);
+                let header = `<h3>Found ${found} pages with "${query}"</h3>`;
+                if (found > MAX_SEARCH_RESULTS) {
+                    header += `<p>Showing the first ${MAX_SEARCH_RESULTS}</p>`;
+                }
+                results.innerHTML = header + rows.join('');
             }
         }
         
         function scrollToPageAndHighlight(num) {
+            renderUntil(num);
             const page = document.querySelector(`[data-page-id="${num}"]`);
             const content = document.getElementById('page-' + num);
             
@@ -520,7 +794,7 @@ def generate_html(pages: list, domain: str, stats: dict, base_url: str,
                 togglePage(num);
             }
             
-            setTimeout(() => {
+            ensurePageBody(num).then(() => setTimeout(() => {
                 page.scrollIntoView({ behavior: 'smooth', block: 'start' });
                 
                 setTimeout(() => {
@@ -533,11 +807,11 @@ def generate_html(pages: list, domain: str, stats: dict, base_url: str,
                         }
                     }
                 }, 300);
-            }, 100);
+            }, 100));
         }
         
-        function exportJSON() {
-            const dataStr = JSON.stringify(pagesData, null, 2);
+        async function exportJSON() {
+            const dataStr = JSON.stringify(await allPages(), null, 2);
             const dataBlob = new Blob([dataStr], {type: 'application/json'});
             const url = URL.createObjectURL(dataBlob);
             const link = document.createElement('a');
@@ -546,9 +820,9 @@ def generate_html(pages: list, domain: str, stats: dict, base_url: str,
             link.click();
         }
         
-        function exportText() {
+        async function exportText() {
             let text = '';
-            pagesData.forEach((page, idx) => {
+            (await allPages()).forEach((page, idx) => {
                 text += `\\n${'='.repeat(80)}\\n`;
                 text += `PAGE ${idx + 1}: ${page.title}\\n`;
                 text += `URL: ${page.url}\\n`;
@@ -572,13 +846,13 @@ def generate_html(pages: list, domain: str, stats: dict, base_url: str,
             link.click();
         }
         
-        function exportMarkdown() {
+        async function exportMarkdown() {
             let md = `# Scraped Content\\n\\n`;
             md += `**Domain:** """ + domain + """\\n`;
             md += `**Date:** ${new Date().toLocaleDateString()}\\n\\n`;
             md += `---\\n\\n`;
             
-            pagesData.forEach((page, idx) => {
+            (await allPages()).forEach((page, idx) => {
                 md += `## ${idx + 1}. ${page.title}\\n\\n`;
                 md += `**URL:** [${page.url}](${page.url})\\n\\n`;
                 
@@ -603,10 +877,4 @@ def generate_html(pages: list, domain: str, stats: dict, base_url: str,
     </script>
 </body>
 </html>
-"""
-    
-    # Save file
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
-    
-    return output_file
+""")
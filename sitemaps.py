@@ -0,0 +1,106 @@
+"""
+Sitemap discovery: seed the crawl with the URLs a site lists itself.
+
+Following links reaches deep pages late (or never, within max_pages), and
+every discovered link costs a page fetch and parse. A site's sitemaps list
+its pages up front: robots.txt names them with Sitemap: lines (otherwise
+/sitemap.xml is tried), a sitemap index (<sitemapindex>) points to more
+sitemaps, and any of them may be gzipped.
+
+Sitemaps are parsed incrementally with XMLPullParser as the response
+streams in. Each <url> element is dropped as soon as it has been read, so
+memory stays flat even for sitemaps with millions of URLs.
+"""
+
+from collections import deque
+from xml.etree.ElementTree import ParseError, XMLPullParser
+import zlib
+
+
+GZIP_MAGIC = b'\x1f\x8b'
+META_FIELDS = ('lastmod', 'priority', 'changefreq')
+
+
+def _local_name(tag: str) -> str:
+    """Tag without its {namespace}."""
+    return tag.rpartition('}')[2]
+
+
+def parse_sitemap(chunks):
+    """Yield (kind, loc, meta) for each entry of a sitemap or sitemap index.
+
+    chunks is an iterable of bytes (gzipped or not). kind is 'url' for a
+    page and 'sitemap' for a nested sitemap; meta holds the entry's
+    lastmod / priority / changefreq, when given. Raises ParseError on
+    malformed XML.
+    """
+    parser = XMLPullParser(events=('start', 'end'))
+    decompressor = None
+    root = None
+    first = True
+
+    def entries():
+        nonlocal root
+        for event, elem in parser.read_events():
+            if event == 'start':
+                if root is None:
+                    root = elem
+                continue
+            kind = _local_name(elem.tag)
+            if kind not in ('url', 'sitemap'):
+                continue
+            fields = {_local_name(child.tag): (child.text or '').strip() for child in elem}
+            loc = fields.get('loc')
+            if loc:
+                yield kind, loc, {key: fields[key] for key in META_FIELDS if fields.get(key)}
+            elem.clear()
+        # Forget the entries read so far so the tree never grows (an entry
+        # still being parsed is detached too, but its end event still comes)
+        if root is not None:
+            del root[:]
+
+    for chunk in chunks:
+        if first and chunk:
+            first = False
+            if chunk.startswith(GZIP_MAGIC):
+                decompressor = zlib.decompressobj(wbits=31)
+        if decompressor:
+            chunk = decompressor.decompress(chunk)
+        parser.feed(chunk)
+        yield from entries()
+    if decompressor:
+        parser.feed(decompressor.flush())
+    parser.close()
+    yield from entries()
+
+
+def iter_sitemap_urls(sitemap_urls, fetch, max_sitemaps: int = 1000, stats: dict = None):
+    """Yield (url, meta) for every page in sitemap_urls and the indexes they nest.
+
+    fetch(url) returns an iterable of byte chunks, or None on failure.
+    Each sitemap is read once, at most max_sitemaps in total. When stats
+    is given, it counts 'sitemaps' read and 'errors'.
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault('sitemaps', 0)
+    stats.setdefault('errors', 0)
+    queue = deque(sitemap_urls)
+    seen = set(queue)
+
+    while queue and stats['sitemaps'] < max_sitemaps:
+        sitemap_url = queue.popleft()
+        chunks = fetch(sitemap_url)
+        if chunks is None:
+            stats['errors'] += 1
+            continue
+        stats['sitemaps'] += 1
+        try:
+            for kind, loc, meta in parse_sitemap(chunks):
+                if kind == 'url':
+                    yield loc, meta
+                elif loc not in seen:
+                    seen.add(loc)
+                    queue.append(loc)
+        except (ParseError, zlib.error) as e:
+            stats['errors'] += 1
+            print(f"  ⚠️  Bad sitemap {sitemap_url}: {str(e)[:50]}")
@@ -0,0 +1,78 @@
+import threading
+
+from crawl_state import CrawlState
+
+
+def test_resume_after_close(tmp_path):
+    db = str(tmp_path / 'state.db')
+    state = CrawlState(db)
+    state.reset()
+    for i, url in enumerate(['a', 'b', 'c', 'd']):
+        state.queued(url, depth=i, meta={'lastmod': '2024'} if url == 'b' else None)
+    state.done('a', {'url': 'a', 'title': 'Ä'})
+    state.failed('c')
+    state.duplicate('d')
+    state.close()
+
+    pending, seen, done = CrawlState(db).load()
+    assert pending == [('b', 1, {'lastmod': '2024'})]
+    assert seen == {'a', 'b', 'c', 'd'}
+    assert done == ['a']
+    assert list(CrawlState(db).iter_pages()) == [{'url': 'a', 'title': 'Ä'}]
+
+
+def test_only_checkpointed_batches_survive_a_crash(tmp_path):
+    db = str(tmp_path / 'state.db')
+    state = CrawlState(db, batch_size=2)
+    state.reset()
+    commits = []
+    for i in range(5):
+        state.queued(f'u{i}', 0)
+        state.done(f'u{i}', {'url': f'u{i}'})
+        state.checkpoint(before_commit=lambda: commits.append(i))
+    # No close(): the last page is still buffered, as after a crash
+    assert commits == [1, 3]
+    assert CrawlState(db).load()[2] == ['u0', 'u1', 'u2', 'u3']
+
+
+def test_sequence_continues_after_reopen(tmp_path):
+    db = str(tmp_path / 'state.db')
+    state = CrawlState(db)
+    state.queued('a', 0)
+    state.done('a', {'url': 'a'})
+    state.close()
+    state.queued('b', 0)
+    state.done('b', {'url': 'b'})
+    state.close()
+    pending, seen, done = CrawlState(db).load()
+    assert done == ['a', 'b']
+    assert seen == {'a', 'b'}
+
+
+def test_reset(tmp_path):
+    db = str(tmp_path / 'state.db')
+    state = CrawlState(db)
+    state.queued('a', 0)
+    state.close()
+    state.reset()
+    assert state.load() == ([], set(), [])
+
+
+def test_used_from_another_thread(tmp_path):
+    state = CrawlState(str(tmp_path / 'state.db'))
+    state.reset()
+    errors = []
+
+    def crawl():
+        try:
+            state.queued('a', 0)
+            state.flush()
+            state.close()
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=crawl)
+    thread.start()
+    thread.join()
+    assert errors == []
+    assert state.load()[0] == [('a', 0, {})]
@@ -0,0 +1,55 @@
+from collections import Counter
+import random
+
+from heavy_hitters import HeavyHitters
+
+
+def zipf_stream(seed: int, length: int = 20000, vocabulary: int = 2000) -> list:
+    rng = random.Random(seed)
+    return rng.choices(range(vocabulary), weights=[1 / (rank + 1) for rank in range(vocabulary)],
+                       k=length)
+
+
+def summarize(items, capacity: int, chunk: int = 100) -> HeavyHitters:
+    summary = HeavyHitters(capacity)
+    for start in range(0, len(items), chunk):
+        summary.update(Counter(items[start:start + chunk]))
+    return summary
+
+
+def check_bounds(summary: HeavyHitters, exact: Counter):
+    assert summary.total == sum(exact.values())
+    assert len(summary) <= 2 * summary.capacity
+    bound = summary.total / (summary.capacity + 1)
+    assert summary.max_error == summary.total // (summary.capacity + 1)
+    for item, count in summary.counts.items():
+        assert exact[item] - bound <= count <= exact[item]
+    for item, count in exact.items():
+        if count > bound:
+            assert item in summary.counts
+
+
+def test_exact_below_capacity():
+    summary = HeavyHitters(capacity=20)
+    summary.update(Counter('abracadabra'))
+    assert summary.most_common(1) == [('a', 5)]
+    assert summary.counts == dict(Counter('abracadabra'))
+    assert summary.max_error == 0
+
+
+def test_misra_gries_bounds():
+    items = zipf_stream(1)
+    check_bounds(summarize(items, capacity=50), Counter(items))
+
+
+def test_merge_keeps_bounds():
+    first, second = zipf_stream(2), zipf_stream(3)
+    merged = summarize(first, capacity=50).merge(summarize(second, capacity=50))
+    check_bounds(merged, Counter(first + second))
+
+
+def test_top_items_found():
+    items = zipf_stream(4)
+    exact = Counter(items)
+    summary = summarize(items, capacity=100)
+    assert [item for item, _ in summary.most_common(3)] == [item for item, _ in exact.most_common(3)]
@@ -0,0 +1,55 @@
+import random
+
+from near_duplicates import NearDuplicateIndex, simhash
+
+
+WORDS = [f'word{i}' for i in range(500)]
+
+
+def article(seed: int, length: int = 300) -> str:
+    return ' '.join(random.Random(seed).choices(WORDS, k=length))
+
+
+def distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def test_simhash_is_stable_64_bit():
+    text = article(1)
+    assert simhash(text) == simhash(text.upper())
+    assert 0 <= simhash(text) < 1 << 64
+    assert simhash('') is None
+    assert simhash('!!!') is None
+    assert simhash('one') is not None
+
+
+def test_similar_texts_are_close():
+    text = article(1)
+    words = text.split()
+    words[150] = 'changed'
+    assert distance(simhash(text), simhash(' '.join(words))) <= 3
+    assert distance(simhash(text), simhash(article(2))) > 10
+
+
+def test_index_finds_near_duplicates():
+    index = NearDuplicateIndex(max_distance=3)
+    assert index.check('a', article(1)) is None
+    assert index.check('b', article(2)) is None
+    words = article(1).split()
+    words[10] = 'tweak'
+    assert index.check('a-print', ' '.join(words)) == 'a'
+    assert index.size == 2
+    assert index.check('empty', '') is None
+
+
+def test_banding_finds_every_fingerprint_within_distance():
+    index = NearDuplicateIndex(max_distance=3)
+    rng = random.Random(5)
+    base = rng.getrandbits(64)
+    index.add(base, 'base')
+    for flips in range(5):
+        for _ in range(50):
+            other = base
+            for bit in rng.sample(range(64), flips):
+                other ^= 1 << bit
+            assert (index.find(other) == 'base') == (flips <= 3)
@@ -0,0 +1,57 @@
+import io
+import json
+
+from search_index import MAX_TERM_LENGTH, build_search_index, write_search_index
+
+
+PAGES = [
+    {'title': 'Apple pie', 'full_text': 'An apple a day. APPLE!'},
+    {'title': None, 'full_text': 'Nothing here'},
+    {'title': 'Apply', 'full_text': 'apply apple ' + 'x' * (MAX_TERM_LENGTH + 1)},
+]
+
+
+def decode(index: dict) -> dict:
+    """{term: {page number: count}} from the written JSON."""
+    out = io.StringIO()
+    write_search_index(out, index)
+    data = json.loads(out.getvalue())
+    result = {}
+    for term, flat in zip(data['terms'], data['postings']):
+        page = 0
+        result[term] = {}
+        for gap, count in zip(flat[::2], flat[1::2]):
+            page += gap
+            result[term][page] = count
+    return result
+
+
+def test_terms_sorted_and_long_terms_skipped():
+    index = build_search_index(PAGES)
+    assert index['terms'] == sorted(index['terms'])
+    assert all(len(term) <= MAX_TERM_LENGTH for term in index['terms'])
+    assert 'apply' in index['terms'] and 'nothing' in index['terms']
+
+
+def test_postings_round_trip():
+    postings = decode(build_search_index(PAGES))
+    assert postings['apple'] == {0: 3, 2: 1}
+    assert postings['apply'] == {2: 2}
+    assert postings['nothing'] == {1: 1}
+
+
+def test_gap_encoding():
+    pages = [{'full_text': 'word'} if i % 3 == 0 else {'full_text': 'other'} for i in range(10)]
+    index = build_search_index(pages)
+    assert list(index['postings']['word']) == [0, 1, 3, 1, 3, 1, 3, 1]
+
+
+def test_pages_read_once():
+    index = build_search_index(iter(PAGES))
+    assert decode(index) == decode(build_search_index(PAGES))
+
+
+def test_empty():
+    out = io.StringIO()
+    write_search_index(out, build_search_index([]))
+    assert json.loads(out.getvalue()) == {'terms': [], 'postings': []}
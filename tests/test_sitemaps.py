@@ -0,0 +1,77 @@
+import gzip
+
+from sitemaps import iter_sitemap_urls, parse_sitemap
+
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+URLSET = f'''<?xml version="1.0" encoding="UTF-8"?>
+<urlset {NS}>
+  <url><loc>https://example.com/a</loc><lastmod>2024-01-02</lastmod><priority>0.8</priority></url>
+  <url><loc> https://example.com/b </loc></url>
+  <url><lastmod>2024-01-03</lastmod></url>
+</urlset>'''.encode('utf-8')
+INDEX = f'''<sitemapindex {NS}>
+  <sitemap><loc>https://example.com/s1.xml.gz</loc></sitemap>
+  <sitemap><loc>https://example.com/s2.xml</loc></sitemap>
+</sitemapindex>'''.encode('utf-8')
+
+
+def split(data: bytes, size: int = 7) -> list:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_urlset_in_small_chunks():
+    assert list(parse_sitemap(split(URLSET))) == [
+        ('url', 'https://example.com/a', {'lastmod': '2024-01-02', 'priority': '0.8'}),
+        ('url', 'https://example.com/b', {}),
+    ]
+
+
+def test_gzipped_sitemap():
+    assert list(parse_sitemap(split(gzip.compress(URLSET)))) == list(parse_sitemap([URLSET]))
+
+
+def test_sitemap_index():
+    assert [(kind, loc) for kind, loc, _ in parse_sitemap([INDEX])] == [
+        ('sitemap', 'https://example.com/s1.xml.gz'),
+        ('sitemap', 'https://example.com/s2.xml'),
+    ]
+
+
+def test_iter_sitemap_urls_follows_indexes_once():
+    files = {
+        'https://example.com/sitemap.xml': INDEX,
+        'https://example.com/s1.xml.gz': gzip.compress(URLSET),
+        'https://example.com/s2.xml': f'<urlset {NS}><url><loc>https://example.com/c</loc></url>'
+                                      f'</urlset>'.encode('utf-8'),
+    }
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        return split(files[url]) if url in files else None
+
+    stats = {}
+    urls = list(iter_sitemap_urls(['https://example.com/sitemap.xml',
+                                   'https://example.com/missing.xml'], fetch, stats=stats))
+    assert [url for url, _ in urls] == ['https://example.com/a', 'https://example.com/b',
+                                        'https://example.com/c']
+    assert sorted(fetched) == sorted(set(fetched))
+    assert stats == {'sitemaps': 3, 'errors': 1}
+
+
+def test_malformed_sitemap_is_counted():
+    stats = {}
+    broken = f'<urlset {NS}><url><loc>https://example.com/a</loc></url><url>'.encode('utf-8')
+    urls = list(iter_sitemap_urls(['s'], lambda url: [broken], stats=stats))
+    assert urls == [('https://example.com/a', {})]
+    assert stats['errors'] == 1
+
+
+def test_max_sitemaps():
+    index = f'<sitemapindex {NS}>' + ''.join(
+        f'<sitemap><loc>s{i}</loc></sitemap>' for i in range(10)) + '</sitemapindex>'
+    stats = {}
+    list(iter_sitemap_urls(['root'], lambda url: [index.encode('utf-8')], max_sitemaps=4,
+                           stats=stats))
+    assert stats['sitemaps'] == 4
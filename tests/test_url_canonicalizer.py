@@ -0,0 +1,70 @@
+import pytest
+
+from url_canonicalizer import URLCanonicalizer, is_tracking_param
+
+
+@pytest.fixture
+def canon():
+    return URLCanonicalizer('https://example.com/')
+
+
+@pytest.mark.parametrize('url', [
+    'https://example.com/docs/',
+    'HTTPS://EXAMPLE.com:443/docs/',
+    'https://www.example.com/docs/',
+    'http://example.com/docs/',
+    'https://example.com/d%6Fcs/',
+    'https://example.com/docs/index.html',
+    'https://example.com/docs/#section',
+    'https://example.com/docs/?utm_source=mail',
+])
+def test_spellings_of_one_page(canon, url):
+    assert canon.canonicalize(url) == 'https://example.com/docs/'
+
+
+def test_escapes_and_non_ascii(canon):
+    assert canon.canonicalize('https://example.com/a%2fb c/café') == \
+        'https://example.com/a%2Fb%20c/caf%C3%A9'
+
+
+def test_trailing_slash_strip():
+    canon = URLCanonicalizer('https://example.com/', trailing_slash='strip')
+    assert canon.canonicalize('https://example.com/docs/') == 'https://example.com/docs'
+    assert canon.canonicalize('https://example.com/') == 'https://example.com/'
+    with pytest.raises(ValueError):
+        URLCanonicalizer('https://example.com/', trailing_slash='sometimes')
+
+
+def test_query_parameters():
+    url = 'https://example.com/list?page=2&utm_campaign=x&b=1&a=2'
+    assert URLCanonicalizer('https://example.com/').canonicalize(url) == 'https://example.com/list'
+    assert (URLCanonicalizer('https://example.com/', keep_params={'page'}).canonicalize(url)
+            == 'https://example.com/list?page=2')
+    assert (URLCanonicalizer('https://example.com/', keep_params=None).canonicalize(url)
+            == 'https://example.com/list?a=2&b=1&page=2')
+
+
+def test_tracking_params():
+    assert is_tracking_param('utm_medium')
+    assert is_tracking_param('FBCLID')
+    assert not is_tracking_param('page')
+
+
+def test_is_internal(canon):
+    assert canon.is_internal('http://www.example.com/x')
+    assert not canon.is_internal('https://other.com/x')
+    assert not canon.is_internal('https://example.com:8443/x')
+    assert not canon.is_internal('mailto:someone@example.com')
+    assert not canon.is_internal('https://example.com:bad/x')
+
+
+def test_external_urls_keep_their_host():
+    canon = URLCanonicalizer('https://example.com/')
+    assert canon.canonicalize('HTTP://Other.COM:80/x#y') == 'http://other.com/x'
+
+
+def test_ipv6_hosts_keep_brackets():
+    canon = URLCanonicalizer('http://[::1]:8080/')
+    assert canon.canonicalize('http://[::1]:8080/a') == 'http://[::1]:8080/a'
+    assert canon.is_internal('http://[::1]:8080/a')
+    assert canon.canonicalize('http://[FE80::1]:80/b') == 'http://[fe80::1]/b'
@@ -0,0 +1,57 @@
+import gzip
+from datetime import timezone
+
+from warc_archive import WARCWriter, iter_warc_records, iter_warc_responses
+
+
+def write_pages(directory, count: int = 3, **options) -> WARCWriter:
+    writer = WARCWriter(str(directory), **options)
+    for i in range(count):
+        writer.write_response(f'https://example.com/{i}', 200,
+                              {'Content-Type': 'text/html', 'Content-Encoding': 'gzip',
+                               'Content-Length': '1'},
+                              f'<p>page {i} é</p>'.encode('utf-8'))
+    writer.close()
+    return writer
+
+
+def test_round_trip(tmp_path):
+    writer = write_pages(tmp_path)
+    responses = list(iter_warc_responses(writer.paths))
+    assert [url for url, *_ in responses] == [f'https://example.com/{i}' for i in range(3)]
+    url, status, headers, body, date = responses[1]
+    assert status == 200
+    assert body == '<p>page 1 é</p>'.encode('utf-8')
+    assert headers.get('content-type') == 'text/html'
+    assert headers.get('Content-Encoding') is None
+    assert headers.get('Content-Length') == str(len(body))
+    assert date.tzinfo == timezone.utc
+
+
+def test_warcinfo_and_digest(tmp_path):
+    writer = write_pages(tmp_path, count=1)
+    records = list(iter_warc_records(writer.paths[0]))
+    assert [headers['warc-type'] for headers, _ in records] == ['warcinfo', 'response']
+    assert records[1][0]['warc-payload-digest'].startswith('sha1:')
+
+
+def test_files_roll_over(tmp_path):
+    writer = write_pages(tmp_path, count=5, max_file_size=1)
+    assert len(writer.paths) == 5
+    assert len(list(iter_warc_responses(writer.paths))) == 5
+
+
+def test_plain_warc(tmp_path):
+    writer = write_pages(tmp_path)
+    plain = tmp_path / 'plain.warc'
+    plain.write_bytes(gzip.decompress(writer.paths[0].read_bytes()))
+    assert len(list(iter_warc_responses([plain]))) == 3
+
+
+def test_truncated_file_stops_at_last_complete_record(tmp_path):
+    writer = write_pages(tmp_path)
+    data = writer.paths[0].read_bytes()
+    truncated = tmp_path / 'truncated.warc.gz'
+    truncated.write_bytes(data[:-40])  # cuts into the last record's gzip member
+    assert [url for url, *_ in iter_warc_responses([truncated])] == [
+        'https://example.com/0', 'https://example.com/1']
@@ -0,0 +1,137 @@
+"""
+TF-IDF keyword scoring over a sparse term-document matrix.
+
+Raw word counts (ContentAnalyzer's top_keywords) favour words that appear
+on every page of a site: menus, footers, boilerplate. TF-IDF down-weights
+them and surfaces what each page is actually about.
+
+Pages are tokenized as they come in and added to a CSR matrix held in
+compact arrays (indptr / indices / counts) batch_size pages at a time,
+in one vectorized pass per batch. Everything after that - document
+frequencies, weights, normalization and the per-page top-k - is done
+with vectorized NumPy operations too. Scoring 100k pages takes seconds;
+building the matrix is bound by tokenizing the text (about 17 s for
+100k pages of 300 words, see `benchmark.py tfidf`).
+
+Weights use sublinear tf (1 + log count), smoothed idf
+(log((1 + n) / (1 + df)) + 1) and L2-normalized page vectors. Site-level
+scores are the sum of a term's page weights.
+"""
+
+from array import array
+import itertools
+import re
+
+import numpy as np
+
+from content_analyzer import STOP_WORDS
+
+
+# Same tokens as content_analyzer.WORD_RE, without its (redundant) \b checks
+TOKEN_RE = re.compile(r'\w+')
+
+
+class TfidfAnalyzer:
+    """Builds the term-document matrix page by page and scores it."""
+
+    def __init__(self, min_length: int = 4, batch_size: int = 1000):
+        """Count words of at least min_length letters that are not stop words."""
+        self.min_length = min_length
+        self.batch_size = batch_size
+        self.vocabulary = {}
+        self.urls = []
+        self.indptr = array('q', [0])
+        self.indices = array('i')
+        self.counts = array('i')
+        self._pending = []
+        self._word_ids = {}  # every word seen: its term id, or -1 if not counted
+
+    def update(self, page: dict):
+        """Add one page as a row of the matrix."""
+        self._pending.append(TOKEN_RE.findall(page.get('full_text', '').lower()))
+        self.urls.append(page.get('url', ''))
+        if len(self._pending) >= self.batch_size:
+            self._add_rows()
+        return self
+
+    def _add_rows(self):
+        """Turn the pending pages into matrix rows in one vectorized pass."""
+        if not self._pending:
+            return
+        words = list(itertools.chain.from_iterable(self._pending))
+        word_ids = self._word_ids
+        for word in sorted(set(words).difference(word_ids)):
+            counted = len(word) >= self.min_length and word not in STOP_WORDS
+            word_ids[word] = self.vocabulary.setdefault(word, len(self.vocabulary)) if counted else -1
+        ids = np.fromiter(map(word_ids.__getitem__, words), dtype=np.int64, count=len(words))
+        rows = np.repeat(np.arange(len(self._pending)), [len(tokens) for tokens in self._pending])
+        keep = ids >= 0
+        # One key per (row, term), sorted by row then term id
+        keys, counts = np.unique(rows[keep] << 32 | ids[keep], return_counts=True)
+        row_sizes = np.bincount(keys >> 32, minlength=len(self._pending))
+        self.indptr.extend((self.indptr[-1] + np.cumsum(row_sizes)).tolist())
+        self.indices.frombytes((keys & 0xFFFFFFFF).astype(np.int32).tobytes())
+        self.counts.frombytes(counts.astype(np.int32).tobytes())
+        self._pending = []
+
+    # Page sink interface (see page_sinks.py)
+    write = update
+
+    def flush(self):
+        self._add_rows()
+
+    def close(self):
+        pass
+
+    def weights(self):
+        """(row ids, term ids, L2-normalized tf-idf weights) of every nonzero entry."""
+        self._add_rows()
+        num_pages = len(self.urls)
+        indptr = np.frombuffer(self.indptr, dtype=np.int64)
+        indices = np.frombuffer(self.indices, dtype=np.int32)
+        counts = np.frombuffer(self.counts, dtype=np.int32)
+        rows = np.repeat(np.arange(num_pages), np.diff(indptr))
+
+        df = np.bincount(indices, minlength=len(self.vocabulary))
+        idf = np.log((1 + num_pages) / (1 + df)) + 1
+        weights = (1 + np.log(counts)) * idf[indices]
+
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=num_pages))
+        weights /= np.where(norms > 0, norms, 1)[rows]
+        return rows, indices, weights
+
+    def top_terms(self, site_top: int = 20, page_top: int = 10) -> dict:
+        """Site-level and per-page top terms.
+
+        Returns {'site': [(term, score), ...],
+                 'pages': {url: [(term, score), ...], ...}}.
+        """
+        terms = np.array(sorted(self.vocabulary, key=self.vocabulary.get), dtype=object)
+        rows, indices, weights = self.weights()
+
+        # Site level: summed page weights
+        site_scores = np.bincount(indices, weights=weights, minlength=len(terms))
+        site_top = min(site_top, len(terms))
+        best = np.argpartition(-site_scores, site_top - 1)[:site_top] if site_top else []
+        site = sorted(((terms[i], round(float(site_scores[i]), 4)) for i in best),
+                      key=lambda item: (-item[1], item[0]))
+
+        # Per page: sort entries by (row, -weight) and keep the first page_top
+        # of each row. Weights are in [0, 1], so one float key does both.
+        order = np.argsort(rows - weights * 0.5, kind='stable')
+        indptr = np.frombuffer(self.indptr, dtype=np.int64)
+        rank = np.arange(len(order)) - indptr[rows]
+        keep = order[rank < page_top]
+        pages = {url: [] for url in self.urls}
+        for row, term, weight in zip(rows[keep].tolist(), terms[indices[keep]].tolist(),
+                                     np.round(weights[keep], 4).tolist()):
+            pages[self.urls[row]].append((term, weight))
+
+        return {'site': site, 'pages': pages}
+
+    @staticmethod
+    def analyze_pages(pages, site_top: int = 20, page_top: int = 10) -> dict:
+        analyzer = TfidfAnalyzer()
+        for page in pages:
+            analyzer.update(page)
+        return analyzer.top_terms(site_top, page_top)
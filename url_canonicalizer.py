@@ -0,0 +1,158 @@
+"""
+URL canonicalization: one spelling per page.
+
+Sites link to the same page in many ways: /docs, /docs/ and
+/docs/index.html, HTTP://Example.com:80/docs, www.example.com/docs,
+/d%6Fcs, or with tracking parameters such as ?utm_source=mail appended.
+URLCanonicalizer rewrites all of these to one canonical URL, and the
+scraper fetches each canonical URL once.
+
+What it does:
+
+- lowercases scheme and host and drops default ports (:80, :443) and
+  #fragments
+- treats www.<host> and <host> as the same site and uses the spelling
+  from base_url. With unify_scheme, http:// and https:// links to the
+  site get base_url's scheme too.
+- normalizes percent-encoding: escapes of unreserved characters are
+  decoded (%6F -> o), all other escapes are uppercased, and spaces and
+  non-ASCII characters are encoded
+- drops index pages (/docs/index.html -> /docs/). trailing_slash='strip'
+  also drops trailing slashes (/docs/ -> /docs). It is off by default
+  because static servers answer /docs with a redirect to /docs/, which
+  costs a request per directory page. /docs and /docs/ still end up as
+  one page through that redirect (see redirects below).
+- query parameters: tracking parameters are always removed, the rest
+  are sorted. keep_params decides which parameters stay: () (default)
+  drops every query, like the scraper always did; a set of names keeps
+  only those (e.g. {'page', 'id'}); None keeps every parameter that is
+  not a tracking parameter.
+
+Two more settings are used by the scraper: rel_canonical follows a
+page's <link rel="canonical">, and redirects follows redirect targets.
+With both, the canonical URL and the redirect target count as visited,
+so they are not fetched again.
+"""
+
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
+import re
+
+
+TRACKING_PARAMS = frozenset({
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'mc_cid', 'mc_eid',
+    'igshid', 'yclid', '_ga', '_gl', '_hsenc', '_hsmi', 'ref_src', 'spm',
+})
+TRACKING_PREFIXES = ('utm_',)
+INDEX_PAGES = ('index.html', 'index.htm', 'index.php', 'default.html', 'default.htm',
+               'default.aspx')
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+_ESCAPE_RE = re.compile(r'%([0-9A-Fa-f]{2})')
+_UNRESERVED = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~')
+# Characters left as they are when (re-)encoding a path
+_PATH_SAFE = "/%:@!$&'()*+,;=-._~"
+
+
+def _normalize_escapes(text: str) -> str:
+    """Decode escaped unreserved characters and uppercase the other escapes."""
+    def fix(match):
+        char = chr(int(match.group(1), 16))
+        return char if char in _UNRESERVED else '%' + match.group(1).upper()
+    return _ESCAPE_RE.sub(fix, text)
+
+
+def is_tracking_param(name: str) -> bool:
+    """True for analytics/campaign parameters that never change the page."""
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+class URLCanonicalizer:
+    """Maps every spelling of a site's URLs to one canonical URL."""
+
+    def __init__(self, base_url: str, keep_params=(), trailing_slash: str = 'keep',
+                 index_pages=INDEX_PAGES, www_alias: bool = True,
+                 unify_scheme: bool = True, rel_canonical: bool = True,
+                 redirects: bool = True):
+        """Canonicalize links of the site at base_url (see module docstring)."""
+        if trailing_slash not in ('strip', 'keep'):
+            raise ValueError(f"Unknown trailing_slash mode: {trailing_slash}")
+        self.keep_params = None if keep_params is None else frozenset(keep_params)
+        self.trailing_slash = trailing_slash
+        self.index_pages = frozenset(index_pages)
+        self.www_alias = www_alias
+        self.unify_scheme = unify_scheme
+        self.rel_canonical = rel_canonical
+        self.redirects = redirects
+
+        base = urlsplit(base_url)
+        self.scheme = base.scheme.lower()
+        self.host = self._netloc(self.scheme, base.hostname or '', base.port)
+        self._site = self._site_key(base.hostname or '', base.port, self.scheme)
+
+    @staticmethod
+    def _netloc(scheme: str, host: str, port) -> str:
+        host = host.lower()
+        if ':' in host:
+            host = f'[{host}]'  # IPv6 literal (urlsplit's hostname drops the brackets)
+        if port is None or DEFAULT_PORTS.get(scheme) == port:
+            return host
+        return f'{host}:{port}'
+
+    def _site_key(self, host: str, port, scheme: str):
+        """(host, port) with www. removed and default ports filled in."""
+        host = host.lower()
+        if self.www_alias and host.startswith('www.'):
+            host = host[4:]
+        return host, port if port is not None else DEFAULT_PORTS.get(scheme)
+
+    def is_internal(self, url: str) -> bool:
+        """True if url is on the same site as base_url."""
+        try:
+            parts = urlsplit(url)
+            port = parts.port
+        except ValueError:
+            return False
+        scheme = parts.scheme.lower()
+        if scheme not in DEFAULT_PORTS:
+            return False
+        site = self._site_key(parts.hostname or '', port, scheme)
+        if site == self._site:
+            return True
+        # http:// and https:// links to the site's default port
+        return (self.unify_scheme and site[0] == self._site[0]
+                and site[1] == DEFAULT_PORTS[scheme] and self._site[1] == DEFAULT_PORTS[self.scheme])
+
+    def canonicalize(self, url: str) -> str:
+        """Canonical spelling of an absolute http(s) URL."""
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        try:
+            port = parts.port
+        except ValueError:
+            port = None
+        if self.is_internal(url):
+            scheme, netloc = self.scheme, self.host
+        else:
+            netloc = self._netloc(scheme, parts.hostname or '', port)
+
+        path = quote(_normalize_escapes(parts.path), safe=_PATH_SAFE) or '/'
+        head, _, last = path.rpartition('/')
+        if last in self.index_pages:
+            path = head + '/'
+        if self.trailing_slash == 'strip' and len(path) > 1:
+            path = path.rstrip('/') or '/'
+
+        return urlunsplit((scheme, netloc, path, self._query(parts.query), ''))
+
+    def _query(self, query: str) -> str:
+        if not query or self.keep_params == frozenset():
+            return ''
+        # parse_qsl decodes every escape, urlencode re-encodes consistently
+        params = [
+            (name, value) for name, value in parse_qsl(query, keep_blank_values=True)
+            if not is_tracking_param(name)
+            and (self.keep_params is None or name in self.keep_params)
+        ]
+        params.sort(key=lambda param: param[0])
+        return urlencode(params, safe=":@!$'()*,;/?")
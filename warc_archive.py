@@ -0,0 +1,174 @@
+"""
+WARC archive of fetched pages, for re-extraction without the network.
+
+WARCWriter stores every page the scraper downloads as a WARC/1.1
+'response' record: the HTTP status line and headers, then the body.
+Records are gzipped one by one and appended to
+<prefix>-<timestamp>-<serial>.warc.gz files, and a new file is started
+once max_file_size is reached. Each file starts with a 'warcinfo' record.
+Any WARC tool can read them.
+
+Bodies are stored as the scraper received them, i.e. already decoded from
+gzip/chunked transfer. The headers are adjusted to match (no
+Content-Encoding / Transfer-Encoding, and Content-Length is the stored
+length). Pages answered from the HTTP cache (304) are stored with their
+cached body as 200 responses.
+
+iter_warc_responses() reads the responses back. It handles .warc.gz
+(multi-member gzip) and plain .warc files; a file cut off mid-record (a
+crawl killed while writing) is read up to its last complete record.
+"""
+
+from datetime import datetime, timezone
+from http import HTTPStatus
+from pathlib import Path
+import base64
+import gzip
+import hashlib
+import http.client
+import io
+import threading
+import uuid
+
+
+WARC_VERSION = b'WARC/1.1'
+# Headers that describe the wire encoding, not the stored body
+SKIP_HEADERS = frozenset({'content-encoding', 'transfer-encoding', 'content-length', 'connection'})
+
+
+def _warc_date() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def _record(warc_type: str, block: bytes, content_type: str, extra: dict = None) -> bytes:
+    """One gzipped WARC record."""
+    headers = {
+        'WARC-Type': warc_type,
+        'WARC-Record-ID': f'<urn:uuid:{uuid.uuid4()}>',
+        'WARC-Date': _warc_date(),
+        **(extra or {}),
+        'Content-Type': content_type,
+        'Content-Length': str(len(block)),
+    }
+    head = WARC_VERSION + b'\r\n' + ''.join(
+        f'{name}: {value}\r\n' for name, value in headers.items()).encode('utf-8')
+    return gzip.compress(head + b'\r\n' + block + b'\r\n\r\n', compresslevel=6, mtime=0)
+
+
+class WARCWriter:
+    """Appends response records to rolling .warc.gz files in a folder."""
+
+    def __init__(self, directory: str, prefix: str = 'crawl',
+                 max_file_size: int = 1024 * 1024 * 1024):
+        """Write into directory (created if needed); files roll over at max_file_size bytes."""
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.max_file_size = max_file_size
+        self.records = 0
+        self.paths = []
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')
+        serial = len(self.paths)
+        path = self.directory / f'{self.prefix}-{stamp}-{serial:05d}.warc.gz'
+        while path.exists():
+            serial += 1
+            path = self.directory / f'{self.prefix}-{stamp}-{serial:05d}.warc.gz'
+        self.paths.append(path)
+        self._file = open(path, 'ab')
+        info = 'software: Website Scraper Pro\r\nformat: WARC File Format 1.1\r\n'
+        self._file.write(_record('warcinfo', info.encode('utf-8'), 'application/warc-fields',
+                                 {'WARC-Filename': path.name}))
+
+    def write_response(self, url: str, status: int, headers, body: bytes):
+        """Archive one HTTP response (headers: any mapping with .items())."""
+        try:
+            reason = HTTPStatus(status).phrase
+        except ValueError:
+            reason = ''
+        lines = [f'HTTP/1.1 {status} {reason}'.rstrip()]
+        lines += [f'{name}: {value}' for name, value in headers.items()
+                  if name.lower() not in SKIP_HEADERS]
+        lines.append(f'Content-Length: {len(body)}')
+        block = ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8', 'replace') + body
+        digest = base64.b32encode(hashlib.sha1(body).digest()).decode('ascii')
+        record = _record('response', block, 'application/http;msgtype=response',
+                         {'WARC-Target-URI': url, 'WARC-Payload-Digest': f'sha1:{digest}'})
+        with self._lock:
+            if self._file is None or self._file.tell() >= self.max_file_size:
+                self._close_file()
+                self._open()
+            self._file.write(record)
+            self.records += 1
+
+    def _close_file(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        """Close the current file (the next record starts a new one)."""
+        with self._lock:
+            self._close_file()
+
+
+def iter_warc_records(path):
+    """Yield (warc_headers, block) for every complete record of a .warc or .warc.gz file."""
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'rb') as stream:
+        while True:
+            try:
+                record = _read_record(stream, path)
+            except (EOFError, gzip.BadGzipFile):
+                return  # truncated gzip member
+            if record is None:
+                return
+            yield record
+
+
+def _read_record(stream, path):
+    """Next (warc_headers, block) of stream, or None at the end or a truncated record."""
+    line = stream.readline()
+    while line and not line.strip():
+        line = stream.readline()  # blank lines between records
+    if not line:
+        return None
+    if not line.startswith(b'WARC/'):
+        raise ValueError(f"Not a WARC record in {path}: {line[:40]!r}")
+    warc_headers = {}
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        if not line.strip():
+            break
+        name, _, value = line.decode('utf-8').partition(':')
+        warc_headers[name.strip().lower()] = value.strip()
+    length = int(warc_headers.get('content-length', 0))
+    block = stream.read(length)
+    if len(block) < length:
+        return None
+    return warc_headers, block
+
+
+def iter_warc_responses(paths):
+    """Yield (url, status, headers, body, date) for each HTTP response record in paths.
+
+    headers is an http.client.HTTPMessage (case-insensitive .get()); date
+    is when the response was archived, as a timezone-aware UTC datetime
+    (the same wherever the archive is replayed).
+    """
+    for path in paths:
+        for warc_headers, block in iter_warc_records(path):
+            if (warc_headers.get('warc-type') != 'response'
+                    or not warc_headers.get('content-type', '').startswith('application/http')):
+                continue
+            stream = io.BytesIO(block)
+            status_line = stream.readline().split(None, 2)
+            headers = http.client.parse_headers(stream)
+            date = datetime.fromisoformat(warc_headers['warc-date'].replace('Z', '+00:00'))
+            yield (warc_headers.get('warc-target-uri', ''), int(status_line[1]), headers,
+                   stream.read(), date)